@@ -0,0 +1,369 @@
+"""schedule.py 성능 측정 스크립트.
+
+Google Sheets 대신 로컬 가짜 워크시트(크기, 지연 시간 조절 가능)를 붙여서
+Streamlit AppTest로 앱을 실제로 돌려 보고 다음을 출력합니다.
+
+- 동작별(load, filter, add, edit, delete, save memo) 재실행 시간
+- 동작별 Sheets API 호출 수 (백그라운드 쓰기 큐가 보낸 요청 포함)
+- 일정 개수(기본 100 ~ 100,000)에 따른 변화
+
+사용법:
+    python benchmark.py
+    python benchmark.py --sizes 100,10000 --latency 0.15 --json bench.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import gspread
+import streamlit as st
+import streamlit.logger
+import streamlit_calendar
+from google.oauth2 import service_account
+from gspread.utils import a1_to_rowcol
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule.py")
+WRITE_METHODS = {"batch_update", "append_row", "append_rows", "delete_rows",
+                 "add_worksheet", "spreadsheet.batch_update"}
+EVENT_HEADER = ["id", "title", "start", "end", "all_day", "color", "description", "attendee",
+                "rrule", "exdates", "recurrence_id", "revision", "updated_at"]
+ATTENDEES = ["밍콩콩", "콩", "밍깅"]
+
+
+# -------------------------
+# 가짜 gspread 객체
+# -------------------------
+
+class FakeWorksheet:
+    """앱이 쓰는 gspread Worksheet 메서드만 흉내 냅니다. 모든 호출은 스프레드시트에 기록됩니다."""
+
+    def __init__(self, spreadsheet, title, rows, sheet_id):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows = rows
+        self.id = sheet_id
+
+    def _call(self, name, payload=None):
+        self.spreadsheet.record(name, payload)
+
+    def get_all_records(self, **kwargs):
+        self._call("get_all_records", self.rows)
+        header = self.rows[0] if self.rows else []
+        return [
+            dict(zip(header, list(row) + [""] * (len(header) - len(row))))
+            for row in self.rows[1:]
+        ]
+
+    def get(self, range_name=None, **kwargs):
+        match = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d*)$", range_name or "")
+        start = int(match.group(2))
+        end = int(match.group(4)) if match.group(4) else len(self.rows)
+        values = [list(row) for row in self.rows[start - 1:end]]
+        self._call("get", values)
+        return values
+
+    def batch_get(self, ranges, **kwargs):
+        values = []
+        for range_name in ranges:
+            start, end = (a1_to_rowcol(cell)[0] for cell in range_name.split(":"))
+            values.append([list(row) for row in self.rows[start - 1:end]])
+        self._call("batch_get", values)
+        return values
+
+    def batch_update(self, data, **kwargs):
+        self._call("batch_update", data)
+        for item in data:
+            first, _ = a1_to_rowcol(item["range"].split(":")[0])
+            for row, values in enumerate(item["values"], start=first):
+                while len(self.rows) < row:
+                    self.rows.append([])
+                self.rows[row - 1] = list(values)
+
+    def append_row(self, values, **kwargs):
+        self._call("append_row", values)
+        self.rows.append(list(values))
+
+    def append_rows(self, values, **kwargs):
+        self._call("append_rows", values)
+        self.rows.extend(list(row) for row in values)
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("delete_rows")
+        del self.rows[start_index - 1:(end_index or start_index)]
+
+
+class FakeSpreadsheet:
+    """가짜 스프레드시트. 호출 수, 주고받은 바이트, 모의 지연 시간을 관리합니다."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = collections.Counter()
+        self.bytes = 0
+        self.sheets = {}
+        # 쓰기마다 올라가는 수정 번호 (Drive modifiedTime 대역)
+        self.revision = 0
+        self.created_at = datetime.now()
+
+    def record(self, name, payload=None):
+        self.calls[name] += 1
+        if name in WRITE_METHODS:
+            self.revision += 1
+        if payload is not None:
+            self.bytes += len(json.dumps(payload, ensure_ascii=False, default=str))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_sheet(self, title, rows):
+        ws = FakeWorksheet(self, title, rows, len(self.sheets) + 1)
+        self.sheets[title] = ws
+        return ws
+
+    def get_lastUpdateTime(self):
+        self.record("get_lastUpdateTime")
+        modified = self.created_at + timedelta(milliseconds=self.revision)
+        return modified.isoformat(timespec="milliseconds") + "Z"
+
+    def worksheet(self, title):
+        self.record("worksheet")
+        if title not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def worksheets(self):
+        self.record("worksheets")
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title, rows, cols, **kwargs):
+        self.record("add_worksheet")
+        return self.add_sheet(title, [])
+
+    def batch_update(self, body):
+        self.record("spreadsheet.batch_update", body)
+        for request in body["requests"]:
+            target = request["deleteDimension"]["range"]
+            ws = next(w for w in self.sheets.values() if w.id == target["sheetId"])
+            del ws.rows[target["startIndex"]:target["endIndex"]]
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+class FakeCalendar:
+    """streamlit_calendar.calendar 대역. 넘겨받은 이벤트 수를 기록하고 정해 둔 상태를 돌려줍니다."""
+
+    def __init__(self):
+        self.state = {}
+        self.last_event_count = 0
+        self.last_payload_bytes = 0
+
+    def __call__(self, events=(), options=None, **kwargs):
+        self.last_event_count = len(events)
+        self.last_payload_bytes = len(json.dumps(list(events), ensure_ascii=False))
+        return self.state
+
+
+def make_spreadsheet(size, latency):
+    """오늘을 중심으로 size개의 일정이 흩어져 있는 스프레드시트를 만듭니다."""
+    spreadsheet = FakeSpreadsheet(latency)
+    today = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    rows = [list(EVENT_HEADER)]
+    # 하루 3건(참석자마다 1건, 시간은 겹치지 않게), 최근 날짜일수록 앞쪽
+    for i in range(size):
+        start = today + timedelta(days=30 - i // 3, hours=4 * (i % 3))
+        rows.append([
+            i + 1,
+            f"약속 {i + 1}",
+            start.isoformat(),
+            (start + timedelta(hours=2)).isoformat(),
+            0,
+            "",
+            "",
+            ATTENDEES[i % len(ATTENDEES)],
+            "",
+            "",
+            "",
+            1,
+            "",
+        ])
+    spreadsheet.add_sheet("events", rows)
+    memo_rows = [["timestamp", "content"]] + [
+        [(today - timedelta(days=i)).isoformat(), f"메모 {i}"] for i in range(50)
+    ][::-1]
+    spreadsheet.add_sheet("memo", memo_rows)
+    return spreadsheet
+
+
+# -------------------------
+# 측정
+# -------------------------
+
+def _install_fakes(spreadsheet, fake_calendar):
+    gspread.authorize = lambda credentials: FakeClient(spreadsheet)
+    service_account.Credentials.from_service_account_info = staticmethod(
+        lambda *args, **kwargs: None
+    )
+    streamlit_calendar.calendar = fake_calendar
+
+
+def _new_app(db_path, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["app_password"] = "benchmark"
+    at.secrets["SPREADSHEET_ID"] = "benchmark"
+    at.secrets["google_service_account"] = {"type": "service_account"}
+    at.secrets["local_db_path"] = db_path
+    # 측정 중에는 주기적인 백그라운드 동기화가 끼어들지 않도록 합니다.
+    at.secrets["replica_sync_interval"] = 3600
+    at.session_state["is_authed"] = True
+    return at
+
+
+def _measure(spreadsheet, fake_calendar, name, action, flush_wait=0.0):
+    before = spreadsheet.calls.copy()
+    bytes_before = spreadsheet.bytes
+    started = time.perf_counter()
+    at = action()
+    elapsed = time.perf_counter() - started
+    if flush_wait:
+        # 쓰기는 백그라운드 큐가 보내므로 한 번 비워질 때까지 기다렸다가 셉니다.
+        time.sleep(flush_wait)
+    if at is not None and at.exception:
+        raise RuntimeError(f"{name}: {at.exception[0].message}")
+    calls = spreadsheet.calls - before
+    return {
+        "action": name,
+        "seconds": round(elapsed, 4),
+        "api_calls": sum(calls.values()),
+        "calls": dict(calls),
+        "bytes": spreadsheet.bytes - bytes_before,
+        "events_sent": fake_calendar.last_event_count,
+        "payload_bytes": fake_calendar.last_payload_bytes,
+    }
+
+
+def run_size(size, latency, flush_wait, timeout):
+    spreadsheet = make_spreadsheet(size, latency)
+    fake_calendar = FakeCalendar()
+    _install_fakes(spreadsheet, fake_calendar)
+    # 이전 크기에서 만든 스냅샷/복제본/큐를 버립니다.
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        at = _new_app(os.path.join(tmp, "replica.db"), timeout)
+        results = []
+
+        def run():
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "load (cold)", run))
+        results.append(_measure(spreadsheet, fake_calendar, "load (warm)", run))
+
+        def filter_attendee():
+            at.multiselect[0].set_value([at.multiselect[0].options[0]])
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "filter", filter_attendee))
+        at.multiselect[0].set_value(list(at.multiselect[0].options))
+        at.run()
+
+        def add_event():
+            at.sidebar.text_input(key="new_title").input("벤치마크 약속")
+            # 기존 일정과 겹치지 않는 시간 (겹치면 확인 경고 때문에 저장되지 않음)
+            times = [t for t in at.sidebar.text_input if t.label.endswith("(HH:MM)")]
+            times[0].input("06:00")
+            times[1].input("07:00")
+            next(b for b in at.sidebar.button if b.label == "➕ 약속 추가").click()
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "add", add_event, flush_wait))
+
+        def open_edit():
+            at.session_state["inline_edit_event_id"] = 1
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "edit (open)", open_edit))
+
+        def save_edit():
+            next(t for t in at.text_input if t.label == "약속명").input("수정된 약속")
+            next(b for b in at.button if b.label == "저장").click()
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "edit (save)", save_edit, flush_wait))
+
+        def delete_event():
+            fake_calendar.state = {
+                "callback": "eventClick",
+                "eventClick": {
+                    "event": {"id": "2", "title": "약속 2", "start": "", "end": "",
+                              "extendedProps": {}},
+                },
+            }
+            at.run()
+            next(b for b in at.button if b.label == "🗑 삭제").click()
+            result = at.run()
+            fake_calendar.state = {}
+            return result
+
+        results.append(_measure(spreadsheet, fake_calendar, "delete", delete_event, flush_wait))
+
+        def save_memo():
+            at.text_area(key="memo_input").input("벤치마크 메모")
+            next(b for b in at.button if "save" in b.label).click()
+            return at.run()
+
+        results.append(_measure(spreadsheet, fake_calendar, "save memo", save_memo))
+
+    for result in results:
+        result["size"] = size
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="schedule.py 재실행 시간과 Sheets API 호출 수 측정")
+    parser.add_argument("--sizes", default="100,1000,10000,100000",
+                        help="측정할 일정 개수 (쉼표로 구분)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="가짜 Sheets API 호출 1번당 지연 시간(초)")
+    parser.add_argument("--flush-wait", type=float, default=1.5,
+                        help="쓰기 동작 뒤 백그라운드 큐가 비워질 때까지 기다릴 시간(초)")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="AppTest 한 번 실행의 제한 시간(초)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args(argv)
+    # AppTest를 스크립트 밖에서 돌릴 때 나오는 ScriptRunContext 경고는 숨깁니다.
+    streamlit.logger.set_log_level("error")
+
+    all_results = []
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        results = run_size(size, args.latency, args.flush_wait, args.timeout)
+        all_results.extend(results)
+        print(f"\n== events: {size:,} (latency {args.latency:.3f}s/call) ==")
+        print(f"{'action':<14}{'seconds':>10}{'calls':>7}{'bytes':>12}{'sent':>7}  detail")
+        for r in results:
+            print(
+                f"{r['action']:<14}{r['seconds']:>10.3f}{r['api_calls']:>7}"
+                f"{r['bytes']:>12,}{r['events_sent']:>7}  {r['calls']}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, ensure_ascii=False, indent=2)
+    return all_results
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
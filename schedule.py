@@ -1,11 +1,31 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.logger import get_logger
 from streamlit_calendar import calendar
 import pandas as pd
+import numpy as np
 from datetime import datetime, date, timedelta
 import time
+import threading
+import os
+import json
+import csv
+import io
+import re
+import hashlib
+import sqlite3
+import bisect
+import abc
+import collections
+import contextlib
+import random
+from concurrent.futures import ThreadPoolExecutor
 from dateutil import tz
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import rrulestr
 
 import gspread
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 import requests
 
@@ -48,6 +68,38 @@ except ImportError:
     SPREADSHEET_ID = st.secrets.get("SPREADSHEET_ID", "")
     LOVE_START_DATE = st.secrets.get("love_start_date", "2025-09-06")
 
+# 로컬 SQLite 복제본 경로와 백그라운드 동기화 주기(초)
+LOCAL_DB_PATH = st.secrets.get(
+    "local_db_path",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "events.db"),
+)
+REPLICA_SYNC_INTERVAL = int(st.secrets.get("replica_sync_interval", 30))
+
+# 일정 쓰기 방식: "optimistic"(기본, 화면에 먼저 반영하고 백그라운드로 저장) 또는 "sync"(저장까지 기다림)
+WRITE_MODE = st.secrets.get("write_mode", "optimistic")
+
+# 저장소 종류: "sheets"(기본), "sqlite"(로컬 파일), "memory"(테스트/벤치마크용)
+STORAGE_BACKEND = st.secrets.get("storage_backend", "sheets")
+LOCAL_STORE_PATH = st.secrets.get(
+    "local_store_path",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store.db"),
+)
+
+# 디버그용 계측 패널 허용 여부. 켜 두면 주소 뒤에 ?debug=1을 붙인 화면에 패널이 보이고,
+# Sheets 호출마다 주고받은 바이트 수도 잽니다. (꺼져 있으면 ?debug=1은 무시)
+DEBUG_PANEL = bool(st.secrets.get("debug_panel", False))
+# Google Sheets API 기본 할당량: 사용자당 분당 읽기 60회, 쓰기 60회
+SHEETS_QUOTA_PER_MINUTE = int(st.secrets.get("sheets_quota_per_minute", 60))
+# 429/5xx 응답을 다시 시도하는 최대 횟수
+SHEETS_MAX_RETRIES = int(st.secrets.get("sheets_max_retries", 5))
+# append_rows 한 번에 붙이는 최대 행 수 (일정 가져오기처럼 많이 추가할 때 나눠 보냄)
+EVENTS_APPEND_CHUNK = int(st.secrets.get("events_append_chunk", 500))
+# 앱 로그 수준. 기본 INFO라 재실행마다 계측 요약 한 줄이 남습니다.
+LOG_LEVEL = str(st.secrets.get("log_level", "INFO")).upper()
+
+# streamlit run에서는 __name__이 __main__이고 루트 로거는 WARNING이라, 핸들러가 붙은 이름 있는 로거를 씁니다.
+logger = get_logger("schedule")
+logger.setLevel(LOG_LEVEL)
 
 
 EVENT_COLUMNS = [
@@ -59,8 +111,332 @@ EVENT_COLUMNS = [
     "color",
     "description",
     "attendee",
+    # 반복 일정: RRULE, 빠진 회차(시작 시각, 쉼표 구분), 특정 회차만 고친 일정의 "<반복 일정 ID>@<원래 시작 시각>"
+    "rrule",
+    "exdates",
+    "recurrence_id",
+    # 동시 수정 확인용: 저장할 때마다 1씩 올라가는 리비전과 그 저장 시각
+    "revision",
+    "updated_at",
 ]
 
+MEMO_COLUMNS = ["timestamp", "content"]
+
+
+# -------------------------
+# 계측 (Sheets 호출 수 / 지연 시간 / 단계별 시간)
+# -------------------------
+
+# 계측하는 gspread 메서드. 읽기/쓰기는 할당량을 따로 셉니다.
+SHEETS_READ_METHODS = {
+    "get_all_records", "get", "batch_get", "worksheet", "worksheets", "get_lastUpdateTime",
+}
+SHEETS_WRITE_METHODS = {"batch_update", "append_row", "append_rows", "delete_rows", "add_worksheet"}
+# 같은 요청을 두 번 보내면 결과가 달라지는 쓰기 (행 추가, 행 번호로 지우기, 시트 추가).
+# 5xx는 시트에 이미 반영된 뒤에 올 수 있으므로 429만 다시 보내고, 나머지는 호출한 쪽에서 확인 후 다시 보냅니다.
+SHEETS_NON_IDEMPOTENT_METHODS = {
+    "append_row", "append_rows", "delete_rows", "add_worksheet", "spreadsheet.batch_update",
+}
+
+
+def _payload_size(value):
+    """주고받은 값의 대략적인 크기(바이트)."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+class RerunTrace:
+    """재실행 1번 동안 스크립트 스레드에서 일어난 Sheets 호출과 단계별 소요 시간."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stages = {}
+
+    def add_call(self, method, seconds, nbytes, failed):
+        # 동시 불러오기 스레드들도 같은 trace에 기록합니다.
+        with self.lock:
+            stat = self.calls.setdefault(method, {"count": 0, "seconds": 0.0, "bytes": 0, "errors": 0})
+            stat["count"] += 1
+            stat["seconds"] += seconds
+            stat["bytes"] += nbytes
+            stat["errors"] += int(failed)
+
+    def summary(self):
+        return {
+            "seconds": round(time.perf_counter() - self.started, 4),
+            "api_calls": sum(stat["count"] for stat in self.calls.values()),
+            "api_seconds": round(sum(stat["seconds"] for stat in self.calls.values()), 4),
+            "api_bytes": sum(stat["bytes"] for stat in self.calls.values()),
+            "calls": {
+                method: dict(stat, seconds=round(stat["seconds"], 4))
+                for method, stat in self.calls.items()
+            },
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+        }
+
+
+class ApiStats:
+    """프로세스 전체의 Sheets 호출 통계.
+
+    백그라운드 스레드의 호출은 누계와 할당량에만 더하고, 스크립트 스레드의 호출은
+    그 재실행의 RerunTrace에도 기록합니다.
+    """
+
+    def __init__(self, measure_bytes=False):
+        self.lock = threading.Lock()
+        self.totals = {}
+        self.recent = collections.deque()
+        self.local = threading.local()
+        # 바이트 수는 값을 JSON으로 직렬화해야 알 수 있어, 패널을 볼 때만 잽니다. (아니면 0)
+        self.measure_bytes = measure_bytes
+
+    def record(self, method, kind, seconds, nbytes, failed=False):
+        now = time.time()
+        with self.lock:
+            stat = self.totals.setdefault(method, {"count": 0, "seconds": 0.0, "bytes": 0, "errors": 0})
+            stat["count"] += 1
+            stat["seconds"] += seconds
+            stat["bytes"] += nbytes
+            stat["errors"] += int(failed)
+            self.recent.append((now, kind))
+            self._expire(now)
+        trace = getattr(self.local, "trace", None)
+        if trace is not None:
+            trace.add_call(method, seconds, nbytes, failed)
+
+    def _expire(self, now):
+        while self.recent and self.recent[0][0] < now - 60:
+            self.recent.popleft()
+
+    def quota_usage(self):
+        """최근 1분 동안의 읽기/쓰기 요청 수."""
+        with self.lock:
+            self._expire(time.time())
+            usage = collections.Counter(kind for _, kind in self.recent)
+        return {"read": usage["read"], "write": usage["write"]}
+
+    def wrap(self, method, kind, fn):
+        """gspread 메서드를 감싸서 호출 시간과 바이트 수를 기록합니다."""
+        def call(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                seconds = time.perf_counter() - started
+                nbytes = 0
+                if self.measure_bytes:
+                    nbytes = _payload_size([args, kwargs] if kind == "write" else result)
+                self.record(method, kind, seconds, nbytes, failed)
+        return call
+
+    def begin_rerun(self):
+        # st.rerun()/st.stop()으로 끝까지 못 간 이전 재실행도 로그는 남깁니다.
+        if getattr(self.local, "trace", None) is not None:
+            self.finish_rerun(interrupted=True)
+        self.local.trace = RerunTrace()
+
+    def current(self):
+        trace = getattr(self.local, "trace", None)
+        return trace.summary() if trace is not None else None
+
+    def finish_rerun(self, interrupted=False):
+        trace = getattr(self.local, "trace", None)
+        self.local.trace = None
+        if trace is None:
+            return None
+        summary = trace.summary()
+        summary["interrupted"] = interrupted
+        summary["quota"] = self.quota_usage()
+        logger.info("rerun %s", json.dumps(summary, ensure_ascii=False))
+        return summary
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 현재 재실행의 단계 시간으로 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace = getattr(self.local, "trace", None)
+            if trace is not None:
+                trace.stages[name] = trace.stages.get(name, 0.0) + time.perf_counter() - started
+
+
+@st.cache_resource
+def get_api_stats():
+    return ApiStats(measure_bytes=DEBUG_PANEL)
+
+
+# 다시 시도할 만한 응답 코드 (할당량 초과, 일시적인 서버 오류)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 반영되지 않은 것이 확실한 응답 코드 (할당량 초과로 거절됨)
+REJECTED_STATUS_CODES = {429}
+# 백그라운드 동기화가 남겨 두어야 하는 토큰 수 (화면을 그리는 읽기 몫)
+BACKGROUND_TOKEN_RESERVE = max(SHEETS_QUOTA_PER_MINUTE // 4, 1)
+
+
+def _api_status_code(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+class RequestScheduler:
+    """모든 Sheets 요청이 거쳐 가는 스케줄러.
+
+    읽기/쓰기마다 분당 할당량 크기의 토큰 버킷을 두고, 토큰이 없으면 기다렸다가 보냅니다.
+    백그라운드 동기화는 화면 쪽 요청이 기다리는 동안, 또는 남은 토큰이 예비분 이하일 때는 양보합니다.
+    429/5xx 응답은 지터를 섞은 지수 백오프로 다시 시도합니다. 다시 보내면 안 되는 쓰기(idempotent=False)는 429만 다시 보냅니다.
+    """
+
+    def __init__(self, per_minute=SHEETS_QUOTA_PER_MINUTE, max_retries=SHEETS_MAX_RETRIES):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.max_retries = max_retries
+        self.condition = threading.Condition()
+        self.tokens = {"read": self.capacity, "write": self.capacity}
+        self.refilled_at = time.monotonic()
+        self.waiting = collections.Counter()
+        self.local = threading.local()
+
+    def mark_background(self):
+        """현재 스레드의 요청을 백그라운드 우선순위로 보냅니다."""
+        self.local.background = True
+
+    def _refill(self):
+        now = time.monotonic()
+        for kind in self.tokens:
+            self.tokens[kind] = min(self.capacity, self.tokens[kind] + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def acquire(self, kind):
+        background = getattr(self.local, "background", False)
+        reserve = BACKGROUND_TOKEN_RESERVE if background else 0
+        with self.condition:
+            if not background:
+                self.waiting[kind] += 1
+            try:
+                while True:
+                    self._refill()
+                    blocked = background and self.waiting[kind] > 0
+                    shortfall = 1 + reserve - self.tokens[kind]
+                    if not blocked and shortfall <= 0:
+                        self.tokens[kind] -= 1
+                        return
+                    self.condition.wait(max(shortfall / self.rate, 0.05))
+            finally:
+                if not background:
+                    self.waiting[kind] -= 1
+                    self.condition.notify_all()
+
+    def call(self, kind, fn, *args, idempotent=True, **kwargs):
+        retryable = RETRYABLE_STATUS_CODES if idempotent else REJECTED_STATUS_CODES
+        for attempt in range(self.max_retries + 1):
+            self.acquire(kind)
+            try:
+                return fn(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = _api_status_code(e)
+                if status not in retryable or attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(32.0, 2.0 ** attempt))
+                logger.warning("Sheets API %s; retrying in %.1fs (attempt %d)", status, delay, attempt + 1)
+                time.sleep(delay)
+
+
+@st.cache_resource
+def get_request_scheduler():
+    return RequestScheduler()
+
+
+class ConcurrentLoader:
+    """여러 읽기를 스레드 풀에서 동시에 실행합니다.
+
+    작업 스레드는 호출한 스레드의 스크립트 실행 문맥, 재실행 trace, 스케줄러 우선순위를 이어받습니다.
+    """
+
+    def __init__(self, stats, scheduler, max_workers=4):
+        self.stats = stats
+        self.scheduler = scheduler
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets-read")
+
+    def run(self, *fns):
+        """fns를 동시에 실행하고 결과를 같은 순서로 반환합니다. 예외는 호출한 쪽에서 다시 발생합니다."""
+        ctx = get_script_run_ctx()
+        trace = getattr(self.stats.local, "trace", None)
+        background = getattr(self.scheduler.local, "background", False)
+
+        def bound(fn):
+            def task():
+                thread = threading.current_thread()
+                add_script_run_ctx(thread, ctx)
+                self.stats.local.trace = trace
+                self.scheduler.local.background = background
+                try:
+                    return fn()
+                finally:
+                    add_script_run_ctx(thread, None)
+                    self.stats.local.trace = None
+                    self.scheduler.local.background = False
+            return task
+
+        futures = [self.pool.submit(bound(fn)) for fn in fns]
+        return [future.result() for future in futures]
+
+
+@st.cache_resource
+def get_concurrent_loader():
+    return ConcurrentLoader(get_api_stats(), get_request_scheduler())
+
+
+class InstrumentedWorksheet:
+    """gspread Worksheet 대리 객체. 계측 대상 메서드는 스케줄러를 거쳐 보내고 ApiStats에 기록합니다."""
+
+    def __init__(self, target, stats, scheduler):
+        self._target = target
+        self._stats = stats
+        self._scheduler = scheduler
+
+    def _scheduled(self, name, kind, fn):
+        timed = self._stats.wrap(name, kind, fn)
+        idempotent = name not in SHEETS_NON_IDEMPOTENT_METHODS
+        return lambda *args, **kwargs: self._scheduler.call(kind, timed, *args, idempotent=idempotent, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in SHEETS_READ_METHODS:
+            return self._scheduled(name, "read", attr)
+        if name in SHEETS_WRITE_METHODS:
+            return self._scheduled(name, "write", attr)
+        return attr
+
+
+class InstrumentedSpreadsheet(InstrumentedWorksheet):
+    """gspread Spreadsheet 대리 객체. 돌려주는 워크시트도 대리 객체로 감쌉니다."""
+
+    def _wrap_sheet(self, ws):
+        return InstrumentedWorksheet(ws, self._stats, self._scheduler)
+
+    def worksheet(self, title):
+        return self._wrap_sheet(self._scheduled("worksheet", "read", self._target.worksheet)(title))
+
+    def worksheets(self):
+        return [self._wrap_sheet(ws) for ws in self._scheduled("worksheets", "read", self._target.worksheets)()]
+
+    def add_worksheet(self, *args, **kwargs):
+        ws = self._scheduled("add_worksheet", "write", self._target.add_worksheet)(*args, **kwargs)
+        return self._wrap_sheet(ws)
+
+    def batch_update(self, body):
+        return self._scheduled("spreadsheet.batch_update", "write", self._target.batch_update)(body)
+
 
 @st.cache_resource
 def get_spreadsheet():
@@ -71,7 +447,9 @@ def get_spreadsheet():
         )
 
         gc = gspread.authorize(credentials)
-        return gc.open_by_key(SPREADSHEET_ID)
+        return InstrumentedSpreadsheet(
+            gc.open_by_key(SPREADSHEET_ID), get_api_stats(), get_request_scheduler()
+        )
     except gspread.exceptions.SpreadsheetNotFound:
         st.error("❌ 스프레드시트를 찾을 수 없습니다.")
         st.stop()
@@ -146,110 +524,2457 @@ def get_memo_sheet():
 
 
 # -------------------------
-# Google Sheets 기반 DB 함수
+# 저장소 백엔드 (Sheets / SQLite / 메모리)
+# -------------------------
+
+class PartialInsertError(Exception):
+    """insert_events가 나눠 붙이다 중간에 실패했습니다. 앞의 written개는 이미 저장됐고, 원래 오류는 __cause__."""
+
+    def __init__(self, written):
+        super().__init__(f"{written}건을 저장한 뒤 실패했습니다.")
+        self.written = written
+
+
+class StorageBackend(abc.ABC):
+    """일정과 메모를 실제로 저장하는 곳. 복제본 동기화와 쓰기 큐는 이 인터페이스만 사용합니다.
+
+    일정 레코드는 EVENT_COLUMNS 키를 가진 dict, 메모 행은 [timestamp, content] 입니다.
+    rows 인자는 일정 ID → (보관 연도, 저장 순서상의 행 번호)로, 행 번호로 찾아가는 저장소만 씁니다.
+    보관 연도 0은 events 시트입니다.
+    """
+
+    # 오래된 일정을 연도별 보관 시트로 나누는지. 읽을 때마다 전체를 내려받는 저장소(Sheets)만 나눕니다.
+    archives_events = False
+    # 같은 컴퓨터에 있어 읽기가 싼 저장소인지. 그런 저장소는 주기적으로 맞추지 않고 재실행마다 맞춥니다.
+    local = False
+    # 복제본이 어느 저장소의 사본인지 구분하는 값. 저장소를 바꾸면 복제본을 비우고 새로 채웁니다.
+    source = None
+
+    def data_version(self):
+        """저장된 데이터가 바뀌면 달라지는 값. 알 수 없으면 None (동기화 때마다 전부 읽음)."""
+        return None
+
+    @abc.abstractmethod
+    def load_events(self):
+        """저장된 순서대로 모든 일정 레코드를 반환합니다."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def fetch_current(self, event_ids, rows):
+        """ID마다 지금 저장된 레코드. rows의 행에 그 ID가 없으면(행이 밀렸거나 지워짐) None."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_events(self, records, rows):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_events(self, event_ids, rows):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def insert_events(self, records):
+        raise NotImplementedError
+
+    # 아래 보관 메서드는 archives_events인 저장소만 다시 정의합니다. 나누지 않는 저장소에는 보관된 일정이 없습니다.
+    def load_event_catalog(self):
+        """보관 시트 목록: 연도마다 {year, events, max_id, archived_at}. 없으면 빈 목록."""
+        return []
+
+    def save_event_catalog(self, entries):
+        pass
+
+    def load_event_archive(self, year):
+        """그 해 보관 시트의 일정 레코드를 저장된 순서대로 반환합니다."""
+        return []
+
+    def append_event_archive(self, year, records):
+        pass
+
+    @abc.abstractmethod
+    def load_memos(self, start):
+        """앞에서 start개를 건너뛴 나머지 메모 행을 반환합니다."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_memo(self, timestamp, content):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_memos(self, count):
+        """가장 오래된 메모 count개를 지웁니다."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_memo_archives(self):
+        """보관된 메모가 있는 연도 목록."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_memo_archive(self, year, rows):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load_memo_archive_tail(self, year, limit):
+        """year 보관분의 마지막 limit개 행. 보관분이 없으면 빈 목록."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load_memo_archive_page(self, year, offset, limit):
+        raise NotImplementedError
+
+
+class SheetsBackend(StorageBackend):
+    """Google Sheets 저장소. 수정/삭제는 행 번호로 바로 찾아가고, 종류별로 요청 1번에 반영합니다."""
+
+    archives_events = True
+
+    def __init__(self, spreadsheet, events_ws, memo_ws):
+        self.spreadsheet = spreadsheet
+        self.events_ws = events_ws
+        self.memo_ws = memo_ws
+        self.source = f"sheets:{SPREADSHEET_ID}"
+        # 보관 연도 → events_YYYY 워크시트 (처음 쓸 때 한 번만 찾음)
+        self.archive_ws = {}
+
+    def ensure_header(self):
+        """events 머리글에 새로 생긴 열(반복 일정 열 등)이 있는지 확인하고 채웁니다. 시작할 때 한 번 부릅니다.
+
+        쓰기는 EVENT_COLUMNS 순서의 열 위치로 하므로, 머리글이 그 앞부분도 아니면 아무것도 쓰지 않고 멈춥니다.
+        """
+        last_cell = rowcol_to_a1(1, len(EVENT_COLUMNS))
+        header = [str(h) for h in (self.events_ws.get(f"A1:{last_cell}") or [[]])[0]]
+        header = [h for h in header if h]
+        if header != EVENT_COLUMNS:
+            if header != EVENT_COLUMNS[:len(header)]:
+                logger.error("unexpected events header %s; expected %s", header, EVENT_COLUMNS)
+                raise RuntimeError(
+                    f"events 시트 머리글이 예상과 다릅니다: {header} (필요한 순서: {EVENT_COLUMNS})"
+                )
+            self.events_ws.batch_update(
+                [{"range": f"A1:{last_cell}", "values": [EVENT_COLUMNS]}],
+                value_input_option="USER_ENTERED",
+            )
+
+    def data_version(self):
+        # Drive의 modifiedTime. 시트를 직접 고친 경우도 포함해 어떤 수정이든 바뀝니다.
+        return self.spreadsheet.get_lastUpdateTime()
+
+    def load_events(self):
+        return self.events_ws.get_all_records()
+
+    def _events_sheet(self, year):
+        """보관 연도에 해당하는 워크시트. 0이면 events 시트."""
+        if not year:
+            return self.events_ws
+        if year not in self.archive_ws:
+            self.archive_ws[year] = self.spreadsheet.worksheet(f"{EVENTS_ARCHIVE_PREFIX}{year}")
+        return self.archive_ws[year]
+
+    @staticmethod
+    def _by_sheet(event_ids, rows):
+        """ID들을 보관 연도(시트)별로 나눕니다."""
+        groups = collections.defaultdict(list)
+        for event_id in event_ids:
+            groups[rows[event_id][0]].append(event_id)
+        return groups
+
+    def fetch_current(self, event_ids, rows):
+        current = {}
+        # 시트마다 필요한 행만 요청 1번으로 읽습니다. 행 번호가 밀렸을 수 있으므로 ID 열까지 확인합니다.
+        for year, ids in self._by_sheet(event_ids, rows).items():
+            values = self._events_sheet(year).batch_get(
+                [f"A{rows[i][1]}:{rowcol_to_a1(rows[i][1], len(EVENT_COLUMNS))}" for i in ids]
+            )
+            for event_id, value in zip(ids, values):
+                row = list(value[0]) if value else []
+                record = dict(zip(EVENT_COLUMNS, row + [""] * (len(EVENT_COLUMNS) - len(row))))
+                current[event_id] = record if str(record["id"]) == str(event_id) else None
+        return current
+
+    def update_events(self, records, rows):
+        by_id = {record["id"]: record for record in records}
+        for year, ids in self._by_sheet(list(by_id), rows).items():
+            self._events_sheet(year).batch_update(
+                [
+                    {
+                        "range": f"A{rows[i][1]}:{rowcol_to_a1(rows[i][1], len(EVENT_COLUMNS))}",
+                        "values": [[by_id[i][col] for col in EVENT_COLUMNS]],
+                    }
+                    for i in ids
+                ],
+                value_input_option="USER_ENTERED",
+            )
+
+    def delete_events(self, event_ids, rows):
+        delete_requests = []
+        for year, ids in self._by_sheet(event_ids, rows).items():
+            sheet_id = self._events_sheet(year).id
+            # 아래 행부터 지워야 위쪽 행 번호가 바뀌지 않습니다. 붙어 있는 행은 한 범위로 묶습니다.
+            spans = []
+            for row in sorted((rows[i][1] for i in ids), reverse=True):
+                if spans and spans[-1][0] == row + 1:
+                    spans[-1][0] = row
+                else:
+                    spans.append([row, row])
+            delete_requests += [
+                {
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": sheet_id,
+                            "dimension": "ROWS",
+                            "startIndex": first - 1,
+                            "endIndex": last,
+                        }
+                    }
+                }
+                for first, last in spans
+            ]
+        self.spreadsheet.batch_update({"requests": delete_requests})
+
+    def insert_events(self, records):
+        values = [[record[col] for col in EVENT_COLUMNS] for record in records]
+        # 한꺼번에 많이 가져올 때는 요청 하나가 너무 커지지 않도록 나눠서 붙입니다.
+        for start in range(0, len(values), EVENTS_APPEND_CHUNK):
+            try:
+                self.events_ws.append_rows(
+                    values[start:start + EVENTS_APPEND_CHUNK],
+                    value_input_option="USER_ENTERED",
+                )
+            except Exception as e:
+                if start:
+                    raise PartialInsertError(start) from e
+                raise
+
+    def load_event_catalog(self):
+        try:
+            catalog_ws = self.spreadsheet.worksheet(EVENTS_CATALOG_SHEET)
+        except gspread.exceptions.WorksheetNotFound:
+            return []
+        return catalog_ws.get_all_records()
+
+    def save_event_catalog(self, entries):
+        values = [EVENT_CATALOG_COLUMNS] + [[e[col] for col in EVENT_CATALOG_COLUMNS] for e in entries]
+        try:
+            catalog_ws = self.spreadsheet.worksheet(EVENTS_CATALOG_SHEET)
+        except gspread.exceptions.WorksheetNotFound:
+            catalog_ws = self.spreadsheet.add_worksheet(
+                title=EVENTS_CATALOG_SHEET, rows=len(values), cols=len(EVENT_CATALOG_COLUMNS)
+            )
+        # 연도는 늘어나기만 하므로 통째로 덮어쓰면 됩니다.
+        catalog_ws.batch_update(
+            [{"range": f"A1:{rowcol_to_a1(len(values), len(EVENT_CATALOG_COLUMNS))}", "values": values}],
+            value_input_option="USER_ENTERED",
+        )
+
+    def load_event_archive(self, year):
+        return self._events_sheet(year).get_all_records()
+
+    def append_event_archive(self, year, records):
+        values = [[record[col] for col in EVENT_COLUMNS] for record in records]
+        try:
+            archive_ws = self._events_sheet(year)
+        except gspread.exceptions.WorksheetNotFound:
+            archive_ws = self.spreadsheet.add_worksheet(
+                title=f"{EVENTS_ARCHIVE_PREFIX}{year}", rows=len(values) + 1, cols=len(EVENT_COLUMNS)
+            )
+            self.archive_ws[year] = archive_ws
+            values = [EVENT_COLUMNS] + values
+        archive_ws.append_rows(values, value_input_option="USER_ENTERED")
+
+    def load_memos(self, start):
+        # 헤더가 1행이므로 데이터는 2행부터입니다.
+        return self.memo_ws.get(f"A{start + 2}:B")
+
+    def append_memo(self, timestamp, content):
+        self.memo_ws.append_row([timestamp, content], value_input_option="USER_ENTERED")
+
+    def delete_memos(self, count):
+        self.memo_ws.delete_rows(2, count + 1)
+
+    def list_memo_archives(self):
+        titles = [ws.title for ws in self.spreadsheet.worksheets()]
+        return [
+            int(t[len(MEMO_ARCHIVE_PREFIX):]) for t in titles
+            if t.startswith(MEMO_ARCHIVE_PREFIX) and t[len(MEMO_ARCHIVE_PREFIX):].isdigit()
+        ]
+
+    def append_memo_archive(self, year, rows):
+        title = f"{MEMO_ARCHIVE_PREFIX}{year}"
+        try:
+            archive_ws = self.spreadsheet.worksheet(title)
+        except gspread.exceptions.WorksheetNotFound:
+            archive_ws = self.spreadsheet.add_worksheet(title=title, rows=len(rows) + 1, cols=2)
+            rows = [MEMO_COLUMNS] + list(rows)
+        archive_ws.append_rows(rows, value_input_option="USER_ENTERED")
+
+    def load_memo_archive_tail(self, year, limit):
+        try:
+            archive_ws = self.spreadsheet.worksheet(f"{MEMO_ARCHIVE_PREFIX}{year}")
+        except gspread.exceptions.WorksheetNotFound:
+            return []
+        # 보관 시트의 행 수를 따로 알 수 없어 한 번에 읽고 뒤쪽만 씁니다. (하루 한 번 도는 작업)
+        return archive_ws.get("A2:B")[-limit:] if limit else []
+
+    def load_memo_archive_page(self, year, offset, limit):
+        start = 2 + offset
+        archive_ws = self.spreadsheet.worksheet(f"{MEMO_ARCHIVE_PREFIX}{year}")
+        return archive_ws.get(f"A{start}:B{start + limit - 1}")
+
+
+class SQLiteBackend(StorageBackend):
+    """로컬 SQLite 파일 저장소. Sheets가 느릴 때 운영하거나 네트워크 없이 부하 테스트할 때 씁니다."""
+
+    local = True
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS store_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER UNIQUE,
+                    title TEXT,
+                    start TEXT,
+                    "end" TEXT,
+                    all_day INTEGER,
+                    color TEXT,
+                    description TEXT,
+                    attendee TEXT,
+                    rrule TEXT,
+                    exdates TEXT,
+                    recurrence_id TEXT,
+                    revision INTEGER,
+                    updated_at TEXT
+                );
+                CREATE TABLE IF NOT EXISTS store_memo (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    content TEXT
+                );
+                CREATE TABLE IF NOT EXISTS store_memo_archive (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    year INTEGER,
+                    timestamp TEXT,
+                    content TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_store_memo_archive_year
+                    ON store_memo_archive (year, seq);
+                """
+            )
+            _add_missing_columns(self.conn, "store_events", EVENT_COLUMNS)
+        self.path = path
+        self.source = f"sqlite:{os.path.abspath(path)}"
+
+    def data_version(self):
+        # 다른 프로세스가 쓴 경우도 잡히도록 파일의 수정 시각과 크기를 씁니다.
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def load_events(self):
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT {_quoted(EVENT_COLUMNS)} FROM store_events ORDER BY seq"
+            )
+            return [dict(zip(EVENT_COLUMNS, row)) for row in cursor]
+
+    def fetch_current(self, event_ids, rows):
+        if not event_ids:
+            return {}
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT {_quoted(EVENT_COLUMNS)} FROM store_events "
+                f"WHERE id IN ({', '.join('?' * len(event_ids))})",
+                list(event_ids),
+            )
+            found = {row[0]: dict(zip(EVENT_COLUMNS, row)) for row in cursor}
+        return {event_id: found.get(event_id) for event_id in event_ids}
+
+    def update_events(self, records, rows):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE store_events SET "
+                + ", ".join(f'"{col}" = ?' for col in EVENT_COLUMNS[1:])
+                + " WHERE id = ?",
+                [[record[col] for col in EVENT_COLUMNS[1:]] + [record["id"]] for record in records],
+            )
+
+    def delete_events(self, event_ids, rows):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM store_events WHERE id = ?", [(i,) for i in event_ids]
+            )
+
+    def insert_events(self, records):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO store_events ({_quoted(EVENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+                [[record[col] for col in EVENT_COLUMNS] for record in records],
+            )
+
+    def load_memos(self, start):
+        with self.lock:
+            return [
+                list(row) for row in self.conn.execute(
+                    "SELECT timestamp, content FROM store_memo ORDER BY seq LIMIT -1 OFFSET ?",
+                    (start,),
+                )
+            ]
+
+    def append_memo(self, timestamp, content):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO store_memo (timestamp, content) VALUES (?, ?)", (timestamp, content)
+            )
+
+    def delete_memos(self, count):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM store_memo WHERE seq IN "
+                "(SELECT seq FROM store_memo ORDER BY seq LIMIT ?)",
+                (count,),
+            )
+
+    def list_memo_archives(self):
+        with self.lock:
+            return [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT year FROM store_memo_archive"
+            )]
+
+    def append_memo_archive(self, year, rows):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO store_memo_archive (year, timestamp, content) VALUES (?, ?, ?)",
+                [(year, row[0], row[1]) for row in rows],
+            )
+
+    def load_memo_archive_tail(self, year, limit):
+        with self.lock:
+            rows = [
+                list(row) for row in self.conn.execute(
+                    "SELECT timestamp, content FROM store_memo_archive WHERE year = ? "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (year, limit),
+                )
+            ]
+        return rows[::-1]
+
+    def load_memo_archive_page(self, year, offset, limit):
+        with self.lock:
+            return [
+                list(row) for row in self.conn.execute(
+                    "SELECT timestamp, content FROM store_memo_archive WHERE year = ? "
+                    "ORDER BY seq LIMIT ? OFFSET ?",
+                    (year, limit, offset),
+                )
+            ]
+
+
+class MemoryBackend(StorageBackend):
+    """프로세스 메모리 저장소. 재시작하면 사라지므로 테스트와 벤치마크에만 씁니다."""
+
+    local = True
+
+    def __init__(self, events=(), memos=()):
+        self.lock = threading.Lock()
+        self.events = [dict(record) for record in events]
+        self.memos = [list(row) for row in memos]
+        self.archives = {}
+        self.source = f"memory:{id(self)}"
+        # events/memo를 고칠 때마다 증가
+        self.version = 0
+
+    def data_version(self):
+        return self.version
+
+    def load_events(self):
+        with self.lock:
+            return [dict(record) for record in self.events]
+
+    def fetch_current(self, event_ids, rows):
+        wanted = set(event_ids)
+        with self.lock:
+            found = {e["id"]: dict(e) for e in self.events if e["id"] in wanted}
+        return {event_id: found.get(event_id) for event_id in event_ids}
+
+    def update_events(self, records, rows):
+        by_id = {record["id"]: record for record in records}
+        with self.lock:
+            self.events = [dict(by_id.get(e["id"], e)) for e in self.events]
+            self.version += 1
+
+    def delete_events(self, event_ids, rows):
+        deleted = set(event_ids)
+        with self.lock:
+            self.events = [e for e in self.events if e["id"] not in deleted]
+            self.version += 1
+
+    def insert_events(self, records):
+        with self.lock:
+            self.events.extend(dict(record) for record in records)
+            self.version += 1
+
+    def load_memos(self, start):
+        with self.lock:
+            return [list(row) for row in self.memos[start:]]
+
+    def append_memo(self, timestamp, content):
+        with self.lock:
+            self.memos.append([timestamp, content])
+            self.version += 1
+
+    def delete_memos(self, count):
+        with self.lock:
+            del self.memos[:count]
+            self.version += 1
+
+    def list_memo_archives(self):
+        with self.lock:
+            return list(self.archives)
+
+    def append_memo_archive(self, year, rows):
+        with self.lock:
+            self.archives.setdefault(year, []).extend(list(row) for row in rows)
+
+    def load_memo_archive_tail(self, year, limit):
+        with self.lock:
+            return [list(row) for row in self.archives.get(year, [])[-limit:]] if limit else []
+
+    def load_memo_archive_page(self, year, offset, limit):
+        with self.lock:
+            return [list(row) for row in self.archives.get(year, [])[offset:offset + limit]]
+
+
+@st.cache_resource
+def get_backend():
+    """설정(storage_backend)에 맞는 저장소를 프로세스당 하나 만듭니다."""
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteBackend(LOCAL_STORE_PATH)
+    if STORAGE_BACKEND == "memory":
+        return MemoryBackend()
+    if STORAGE_BACKEND != "sheets":
+        raise ValueError(f"알 수 없는 storage_backend입니다: {STORAGE_BACKEND!r} (sheets, sqlite, memory 중 하나)")
+    spreadsheet = get_spreadsheet()
+    # 두 워크시트 조회를 동시에 보냅니다.
+    events_ws, memo_ws = get_concurrent_loader().run(get_events_sheet, get_memo_sheet)
+    backend = SheetsBackend(spreadsheet, events_ws, memo_ws)
+    # 머리글이 맞지 않으면 쓰기마다 실패하는 대신 여기서 한 번 멈춥니다. (예외는 캐시되지 않아 고치면 다시 확인)
+    backend.ensure_header()
+    return backend
+
+
+# -------------------------
+# events 스냅샷 캐시 (모든 세션 공유)
+# -------------------------
+
+# 스냅샷 유지 시간(초). 시트를 직접 수정한 경우에도 이 시간이 지나면 다시 읽습니다.
+EVENTS_CACHE_TTL = 60
+
+
+def _parse_event_times(values):
+    # 시트에 적힌 시각 그대로(벽시계 기준) 읽습니다. 오프셋이 붙어 있으면 떼어냅니다.
+    text = values.astype(str).str.replace(r"(Z|[+-]\d{2}:?\d{2})$", "", regex=True)
+    return pd.to_datetime(text, errors="coerce", format="ISO8601")
+
+
+def _flag_values(values):
+    """all_day 같은 0/1, TRUE/FALSE 값을 bool 배열로 바꿉니다."""
+    text = values.astype(str).str.strip().str.upper()
+    numeric = pd.to_numeric(values, errors="coerce")
+    return (numeric.fillna(0) != 0) | (text == "TRUE")
+
+
+def normalize_events(df):
+    """읽어 온 일정을 타입이 정해진 열로 바꿉니다. 시작/종료 시각은 여기서 한 번만 파싱합니다.
+
+    ID나 시작 시각을 읽을 수 없는 행은 달력에 그리거나 고칠 수 없으므로 뺍니다. (남은 행의 인덱스는 그대로)
+    """
+    df = df.reindex(columns=EVENT_COLUMNS)
+    start = _parse_event_times(df["start"])
+    out = pd.DataFrame({
+        "id": pd.to_numeric(df["id"], errors="coerce").astype("Int64"),
+        "title": df["title"].fillna("").astype(str),
+        "start": start,
+        "end": _parse_event_times(df["end"]).fillna(start),
+        "all_day": _flag_values(df["all_day"]),
+        "color": df["color"].astype("category"),
+        "description": df["description"].fillna("").astype(str),
+        "attendee": df["attendee"].astype("category"),
+        "rrule": df["rrule"].fillna("").astype(str),
+        "exdates": df["exdates"].fillna("").astype(str),
+        "recurrence_id": df["recurrence_id"].fillna("").astype(str),
+        "revision": pd.to_numeric(df["revision"], errors="coerce").fillna(0).astype(int),
+        "updated_at": df["updated_at"].fillna("").astype(str),
+    })
+    usable = out["id"].notna() & out["start"].notna()
+    if not usable.all():
+        logger.warning("skipping %d event rows without a readable id or start", int((~usable).sum()))
+        out = out[usable]
+    return out
+
+
+def _append_events(df, new_rows):
+    if not len(df):
+        return new_rows
+    out = pd.concat([df, new_rows], ignore_index=True)
+    # 카테고리가 다르면 concat 결과가 object가 되므로 다시 맞춥니다.
+    for col in ("color", "attendee"):
+        out[col] = out[col].astype("category")
+    return out
+
+
+class EventsCache:
+    """프로세스 전체가 공유하는 events 스냅샷. 쓰기 함수가 곧바로 갱신합니다."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.df = None
+        # ID → (보관 연도, 시트 행 번호). 연도 0은 events 시트. update/delete가 find() 없이 바로 행을 찾는 데 씁니다.
+        self.row_index = {}
+        self.loaded_at = 0.0
+        # 스냅샷이 바뀔 때마다 증가하는 데이터 버전
+        self.version = 0
+        self._interval_index = None
+        self._series_index = None
+        self._positions = None
+
+    def is_fresh(self):
+        return self.df is not None and time.time() - self.loaded_at < EVENTS_CACHE_TTL
+
+    def set(self, df):
+        with self.lock:
+            if "row_num" in df.columns:
+                self.row_index = {
+                    int(i): (int(y), int(r))
+                    for i, y, r in zip(df["id"], df["archive_year"], df["row_num"])
+                }
+            else:
+                self.row_index = {}
+            self.df = normalize_events(df)
+            self.loaded_at = time.time()
+            self.version += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.df = None
+            self.row_index = {}
+            self.version += 1
+
+    def row_of(self, event_id):
+        with self.lock:
+            return self.row_index.get(event_id)
+
+    def interval_index(self):
+        """현재 버전의 구간 인덱스. 스냅샷이 바뀐 뒤 처음 찾을 때 한 번만 만듭니다."""
+        with self.lock:
+            if self._interval_index is None or self._interval_index.version != self.version:
+                self._interval_index = EventIntervalIndex(self.df, self.version)
+            return self._interval_index
+
+    def series_index(self):
+        """현재 버전의 반복 일정 인덱스. 창별 펼친 결과도 이 객체에 캐시됩니다."""
+        with self.lock:
+            if self._series_index is None or self._series_index.version != self.version:
+                self._series_index = SeriesIndex(self.df, self.version)
+            return self._series_index
+
+    def id_positions(self):
+        """현재 버전의 ID → df 행 위치(iloc). interval_index와 같이 버전마다 한 번만 만듭니다."""
+        with self.lock:
+            if self._positions is None or self._positions[0] != self.version:
+                ids = self.df["id"].to_numpy(dtype="float64", na_value=np.nan)
+                self._positions = (
+                    self.version,
+                    {int(i): pos for pos, i in enumerate(ids) if not np.isnan(i)},
+                )
+            return self._positions[1]
+
+    def rows_for(self, event_ids, loader):
+        """ID들의 시트 행 번호. 스냅샷이 비어 있으면 loader로 먼저 채웁니다."""
+        with self.lock:
+            if self.df is None:
+                self.set(loader())
+            return {event_id: self.row_index.get(event_id) for event_id in event_ids}
+
+    def apply(self, records=(), deleted_ids=()):
+        """시트에 반영된 변경을 스냅샷에 적용합니다. 삭제를 먼저, 추가/수정을 나중에 처리합니다."""
+        with self.lock:
+            if self.df is None:
+                return
+            deleted_rows = collections.defaultdict(list)
+            for event_id in deleted_ids:
+                if event_id in self.row_index:
+                    year, row = self.row_index.pop(event_id)
+                    deleted_rows[year].append(row)
+            if deleted_rows:
+                # 행을 지우면 같은 시트에서 그 아래 행들은 지운 개수만큼 올라갑니다.
+                for rows in deleted_rows.values():
+                    rows.sort()
+                self.row_index = {
+                    i: (y, r - bisect.bisect_left(deleted_rows.get(y, ()), r))
+                    for i, (y, r) in self.row_index.items()
+                }
+            # append_rows는 events 시트의 마지막 데이터 행 바로 아래에 추가됩니다.
+            last = None
+            for record in records:
+                if record["id"] not in self.row_index:
+                    if last is None:
+                        last = max((r for y, r in self.row_index.values() if y == 0), default=1)
+                    last += 1
+                    self.row_index[record["id"]] = (0, last)
+            changed_ids = set(deleted_ids) | {record["id"] for record in records}
+            df = self.df[~self.df["id"].isin(changed_ids)]
+            if records:
+                df = _append_events(df, normalize_events(pd.DataFrame(list(records))))
+            self.df = df.reset_index(drop=True)
+            self.version += 1
+
+
+class EventIntervalIndex:
+    """start 기준으로 정렬한 구간 인덱스. 창과 겹치는 일정을 O(log n + k)로 찾습니다.
+
+    반복 일정 행은 회차가 창마다 다르므로 여기 넣지 않고 SeriesIndex가 따로 펼칩니다.
+    """
+
+    def __init__(self, df, version):
+        self.version = version
+        starts = df["start"]
+        ends = df["end"].fillna(starts)
+        valid = starts.notna().to_numpy() & (df["rrule"] == "").to_numpy()
+        s = starts.to_numpy()[valid]
+        e = np.maximum(ends.to_numpy()[valid], s)
+        order = np.argsort(s, kind="stable")
+        self.positions = np.flatnonzero(valid)[order]
+        self.starts = s[order]
+        self.ends = e[order]
+        # 앞에서부터의 최대 종료 시각. 이 값이 창 시작보다 이르면 그 앞은 볼 필요가 없습니다.
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def query(self, window_start, window_end):
+        """[window_start, window_end)와 겹치는 행 위치(df.iloc용)를 원래 순서대로 반환합니다."""
+        window_start = np.datetime64(pd.Timestamp(window_start).tz_localize(None))
+        window_end = np.datetime64(pd.Timestamp(window_end).tz_localize(None))
+        lo = np.searchsorted(self.max_ends, window_start, side="left")
+        hi = np.searchsorted(self.starts, window_end, side="left")
+        hit = (self.ends[lo:hi] > window_start) | (self.starts[lo:hi] >= window_start)
+        return np.sort(self.positions[lo:hi][hit])
+
+
+@st.cache_resource
+def get_events_cache():
+    return EventsCache()
+
+
+# -------------------------
+# 반복 일정 (RRULE 한 행 + 빠진 회차 + 회차별 수정)
 # -------------------------
 
-def fetch_events() -> pd.DataFrame:
+# 창별로 펼친 결과를 몇 개까지 기억할지 (보통 앞뒤 달 이동 정도)
+SERIES_EXPANSION_CACHE_SIZE = 16
+
+
+def occurrence_slots(rrule, start, end, limit=200):
+    """새로 저장할 반복 일정의 회차 (시작, 종료) 목록. 겹침 검사용이라 앞에서 limit개까지만."""
+    duration = end - start
+    rule = rrulestr(rrule, dtstart=start)
+    slots = []
+    for occurrence in rule:
+        slots.append((occurrence, occurrence + duration))
+        if len(slots) >= limit:
+            break
+    return slots
+
+
+def occurrence_key(start):
+    """회차를 가리키는 시작 시각 문자열. exdates와 recurrence_id에 이 형식으로 적습니다."""
+    return pd.Timestamp(start).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _exdate_keys(text):
+    keys = set()
+    for value in str(text or "").split(","):
+        value = value.strip()
+        if value:
+            parsed = _parse_event_times(pd.Series([value])).iloc[0]
+            if pd.notna(parsed):
+                keys.add(occurrence_key(parsed))
+    return keys
+
+
+def _occurrence_ids(df):
+    """펼친 반복 회차마다 recurrence_id 형식의 값("반복ID@회차"). 반복 일정이 아닌 행은 빈 문자열."""
+    keys = df["id"].astype(str) + "@" + df["start"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return keys.where(df["rrule"] != "", "")
+
+
+class SeriesIndex:
+    """반복 일정을 창 단위로 펼칩니다. 같은 버전의 같은 창은 한 번만 계산합니다."""
+
+    def __init__(self, df, version, overrides=()):
+        self.version = version
+        self.lock = threading.Lock()
+        self.series = df[(df["rrule"] != "") & df["start"].notna()]
+        # 따로 고친 회차. 펼칠 때 원래 회차를 건너뜁니다. (overrides: df 밖에 있는 것까지)
+        self.overrides = set(df["recurrence_id"][df["recurrence_id"] != ""]) | set(overrides)
+        self.columns = df.columns
+        self.dtypes = df.dtypes.to_dict()
+        self.expansions = collections.OrderedDict()
+
+    def expand(self, window_start, window_end, remember=True):
+        """[window_start, window_end)와 겹치는 회차들을 일반 일정과 같은 열의 DataFrame으로 반환합니다.
+
+        remember=False면 결과를 캐시에 넣지 않습니다. (겹침 검사처럼 한 번 쓰고 마는 좁은 창)
+        """
+        window_start = pd.Timestamp(window_start).tz_localize(None)
+        window_end = pd.Timestamp(window_end).tz_localize(None)
+        key = (window_start, window_end)
+        with self.lock:
+            if key in self.expansions:
+                self.expansions.move_to_end(key)
+                return self.expansions[key]
+        rows = []
+        for row in self.series.itertuples(index=False):
+            duration = max(row.end - row.start, pd.Timedelta(0))
+            try:
+                rule = rrulestr(row.rrule, dtstart=row.start.to_pydatetime())
+            except (ValueError, TypeError):
+                logger.warning("skipping event %s with invalid rrule %r", row.id, row.rrule)
+                continue
+            skipped = _exdate_keys(row.exdates)
+            # 창 시작 전에 시작했어도 창 안까지 이어지는 회차는 포함합니다.
+            for start in rule.between((window_start - duration).to_pydatetime(), window_end.to_pydatetime(), inc=True):
+                start = pd.Timestamp(start)
+                if start >= window_end or (start + duration <= window_start and start < window_start):
+                    continue
+                key_text = occurrence_key(start)
+                if key_text in skipped or f"{row.id}@{key_text}" in self.overrides:
+                    continue
+                rows.append(row._replace(start=start, end=start + duration))
+        result = pd.DataFrame(rows, columns=self.columns).astype(self.dtypes)
+        if not remember:
+            return result
+        with self.lock:
+            self.expansions[key] = result
+            while len(self.expansions) > SERIES_EXPANSION_CACHE_SIZE:
+                self.expansions.popitem(last=False)
+        return result
+
+
+# -------------------------
+# 로컬 SQLite 복제본 (events.db)
+# -------------------------
+
+
+def _row_hash(record, columns):
+    values = ["" if record.get(col) is None else str(record.get(col)) for col in columns]
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _quoted(columns):
+    # "end" 는 SQL 예약어라서 컬럼명을 항상 따옴표로 감쌉니다.
+    return ", ".join(f'"{col}"' for col in columns)
+
+
+def _add_missing_columns(conn, table, columns, column_type="TEXT"):
+    """예전 버전에서 만든 테이블에 새로 생긴 열을 붙입니다."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for col in columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN "{col}" {column_type}')
+
+
+class LocalReplica:
+    """events/memo 워크시트의 로컬 SQLite 사본. 모든 읽기는 여기서 처리합니다."""
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # 로컬 쓰기가 일어날 때마다 증가. 동기화 도중 쓰기가 있었으면 그 결과를 버립니다.
+        self.write_generation = 0
+        # 가장 최신 메모 (timestamp, content). save_memo와 동기화가 갱신합니다.
+        self.latest = None
+        with self.lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    start TEXT,
+                    "end" TEXT,
+                    all_day INTEGER,
+                    color TEXT,
+                    description TEXT,
+                    attendee TEXT,
+                    rrule TEXT,
+                    exdates TEXT,
+                    recurrence_id TEXT,
+                    revision INTEGER,
+                    updated_at TEXT,
+                    archive_year INTEGER NOT NULL DEFAULT 0,
+                    row_num INTEGER,
+                    row_hash TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_events_range ON events (start, "end");
+                CREATE INDEX IF NOT EXISTS idx_events_attendee ON events (attendee);
+                CREATE TABLE IF NOT EXISTS memo (
+                    row_hash TEXT PRIMARY KEY,
+                    timestamp TEXT,
+                    content TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_memo_timestamp ON memo (timestamp);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                """
+            )
+            _add_missing_columns(self.conn, "events", EVENT_COLUMNS)
+            # 그 일정이 있는 시트: 0이면 events, 아니면 보관 시트 events_YYYY의 연도
+            _add_missing_columns(self.conn, "events", ["archive_year"], "INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_sheet_row ON events (archive_year, row_num)"
+            )
+
+    def _set_state(self, key, value):
+        self.conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def get_state(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM sync_state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def use_source(self, source):
+        """이 사본이 source 저장소를 따라가게 합니다. 다른 저장소의 사본이었으면 비우고 True를 반환합니다."""
+        with self.lock, self.conn:
+            if self.get_state("source") == str(source):
+                return False
+            # 행 번호, 읽은 메모 수, 데이터 버전 모두 이전 저장소 기준이므로 함께 지웁니다.
+            self.conn.execute("DELETE FROM events")
+            self.conn.execute("DELETE FROM memo")
+            self.conn.execute("DELETE FROM sync_state")
+            self._set_state("source", source)
+            self.write_generation += 1
+            self.latest = None
+        return True
+
+    def last_synced_at(self):
+        value = self.get_state("synced_at")
+        return float(value) if value is not None else None
+
+    def read_events(self):
+        with self.lock:
+            return pd.read_sql_query(
+                f"SELECT {_quoted(EVENT_COLUMNS)}, archive_year, row_num FROM events "
+                "ORDER BY archive_year, row_num",
+                self.conn,
+            )
+
+    def event_archive_catalog(self):
+        """보관 시트 목록(load_event_catalog 결과). 받아 온 적이 없으면 None."""
+        value = self.get_state("event_archive_catalog")
+        return json.loads(value) if value is not None else None
+
+    def set_event_archive_catalog(self, entries, archived=False):
+        """보관 시트 목록을 저장합니다. archived=True면 보관 작업을 마친 시각도 기록합니다."""
+        with self.lock, self.conn:
+            self._set_state("event_archive_catalog", json.dumps(entries, ensure_ascii=False, default=str))
+            if archived:
+                self._set_state("events_archived_at", time.time())
+
+    def archived_max_event_id(self):
+        """보관 시트로 옮긴 일정 중 가장 큰 ID. 불러오지 않은 해의 ID를 다시 발급하지 않는 데 씁니다."""
+        return max((int(e["max_id"] or 0) for e in self.event_archive_catalog() or []), default=0)
+
+    def event_archive_loaded_at(self, year):
+        value = self.get_state(f"event_archive_loaded:{year}")
+        return float(value) if value is not None else None
+
+    def forget_event_archive(self, year):
+        """불러온 보관 연도를 버립니다. 다음에 그 해를 볼 때 다시 불러옵니다."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM events WHERE archive_year = ?", (year,))
+            self.conn.execute(
+                "DELETE FROM sync_state WHERE key = ?", (f"event_archive_loaded:{year}",)
+            )
+
+    def max_event_id(self):
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def latest_memo(self):
+        with self.lock:
+            if self.latest is None:
+                # timestamp 인덱스를 타므로 메모가 아무리 많아도 한 행만 읽습니다.
+                self.latest = self.conn.execute(
+                    "SELECT timestamp, content FROM memo ORDER BY timestamp DESC LIMIT 1"
+                ).fetchone()
+            return self.latest[1] if self.latest else None
+
+    def memo_row_count(self):
+        """지금까지 시트에서 읽어 온 memo 데이터 행 수."""
+        return int(self.get_state("memo_rows") or 0)
+
+    def recent_memos(self, offset, limit):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT timestamp, content FROM memo ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+
+    def apply_events(self, records, generation, archive_year=0):
+        """시트에서 읽은 행과 비교해 바뀐 행만 반영합니다. 바뀐 행 수를 반환합니다.
+
+        archive_year를 주면 events 시트 대신 그 해 보관 시트를 읽은 것으로 보고 그 해 행끼리만 비교합니다.
+        """
+        with self.lock, self.conn:
+            if generation != self.write_generation:
+                return 0
+            local = dict(self.conn.execute(
+                "SELECT id, row_hash FROM events WHERE archive_year = ?", (archive_year,)
+            ))
+            local_rows = dict(self.conn.execute(
+                "SELECT id, row_num FROM events WHERE archive_year = ?", (archive_year,)
+            ))
+            changed, moved, seen = [], [], set()
+            for row_num, record in enumerate(records, start=2):
+                try:
+                    event_id = int(record.get("id"))
+                except (TypeError, ValueError):
+                    continue
+                seen.add(event_id)
+                row_hash = _row_hash(record, EVENT_COLUMNS)
+                if local.get(event_id) != row_hash:
+                    # 다른 시트에 있던 ID면(보관 시트로 옮겨졌거나 되돌아옴) 이 시트 행으로 바뀝니다.
+                    changed.append(
+                        [event_id] + [record.get(col) for col in EVENT_COLUMNS[1:]]
+                        + [archive_year, row_num, row_hash]
+                    )
+                elif local_rows.get(event_id) != row_num:
+                    moved.append((row_num, event_id))
+            removed = [(event_id,) for event_id in local if event_id not in seen]
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO events ({_quoted(EVENT_COLUMNS)}, archive_year, row_num, row_hash) "
+                f"VALUES ({', '.join('?' * (len(EVENT_COLUMNS) + 3))})",
+                changed,
+            )
+            self.conn.executemany("UPDATE events SET row_num = ? WHERE id = ?", moved)
+            self.conn.executemany("DELETE FROM events WHERE id = ?", removed)
+            if archive_year:
+                self._set_state(f"event_archive_loaded:{archive_year}", time.time())
+            else:
+                self._set_state("synced_at", time.time())
+            return len(changed) + len(removed)
+
+    def mark_synced(self, version, generation):
+        """저장소의 데이터 버전까지 반영했음을 기록합니다. 그 사이 로컬 쓰기가 있었으면 기록하지 않습니다."""
+        with self.lock, self.conn:
+            if generation != self.write_generation:
+                return
+            self._set_state("data_version", version)
+            self._set_state("synced_at", time.time())
+
+    def append_memo(self, rows):
+        """memo 시트 끝에 새로 붙은 행들을 반영합니다. memo는 추가만 되므로 이것으로 충분합니다."""
+        with self.lock, self.conn:
+            for row in rows:
+                if not any(row):
+                    continue
+                record = dict(zip(MEMO_COLUMNS, list(row) + [""] * len(MEMO_COLUMNS)))
+                self._insert_memo(str(record["timestamp"]), record["content"])
+            self._set_state("memo_rows", self.memo_row_count() + len(rows))
+
+    def _insert_memo(self, timestamp, content):
+        record = {"timestamp": timestamp, "content": content}
+        self.conn.execute(
+            "INSERT OR IGNORE INTO memo VALUES (?, ?, ?)",
+            (_row_hash(record, MEMO_COLUMNS), timestamp, content),
+        )
+        if self.latest is not None and timestamp >= self.latest[0]:
+            self.latest = (timestamp, content)
+
+    def apply_local(self, records=(), deleted_ids=()):
+        """시트에 반영된 추가/수정/삭제를 복제본에 적용합니다."""
+        with self.lock, self.conn:
+            self.write_generation += 1
+            deleted_rows = collections.defaultdict(list)
+            if deleted_ids:
+                for archive_year, row_num in self.conn.execute(
+                    "SELECT archive_year, row_num FROM events "
+                    f"WHERE id IN ({', '.join('?' * len(deleted_ids))})",
+                    list(deleted_ids),
+                ):
+                    deleted_rows[archive_year].append(row_num)
+            self.conn.executemany("DELETE FROM events WHERE id = ?", [(i,) for i in deleted_ids])
+            for archive_year, rows in deleted_rows.items():
+                # 시트에서 행을 지운 뒤 같은 시트의 아래 행들이 올라가는 것과 맞춥니다.
+                rows.sort()
+                shifted = [
+                    (row_num - bisect.bisect_left(rows, row_num), event_id)
+                    for event_id, row_num in self.conn.execute(
+                        "SELECT id, row_num FROM events WHERE archive_year = ? AND row_num > ?",
+                        (archive_year, rows[0]),
+                    ).fetchall()
+                ]
+                self.conn.executemany("UPDATE events SET row_num = ? WHERE id = ?", shifted)
+            # 새 일정은 events 시트 끝에 붙습니다. 이미 있는 일정은 있던 시트와 행 그대로 둡니다.
+            self.conn.executemany(
+                f"INSERT INTO events ({_quoted(EVENT_COLUMNS)}, row_num, row_hash) "
+                f"VALUES ({', '.join('?' * len(EVENT_COLUMNS))}, "
+                "(SELECT COALESCE(MAX(row_num), 1) + 1 FROM events WHERE archive_year = 0), ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                + ", ".join(f'"{col}" = excluded."{col}"' for col in EVENT_COLUMNS[1:])
+                + ", row_hash = excluded.row_hash",
+                [
+                    [record[col] for col in EVENT_COLUMNS] + [_row_hash(record, EVENT_COLUMNS)]
+                    for record in records
+                ],
+            )
+
+    def drop_archived_memos(self, rows):
+        """보관 시트로 옮겨져 memo 시트 앞쪽에서 지워진 행들을 반영합니다."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM memo WHERE row_hash = ?",
+                [(_row_hash(dict(zip(MEMO_COLUMNS, row)), MEMO_COLUMNS),) for row in rows],
+            )
+            self._set_state("memo_rows", max(self.memo_row_count() - len(rows), 0))
+            self._set_state("memo_archived_at", time.time())
+
+    def add_memo(self, timestamp, content):
+        with self.lock, self.conn:
+            self._insert_memo(timestamp, content)
+            self.latest = (timestamp, content)
+
+
+@st.cache_resource
+def get_local_replica():
+    return LocalReplica(LOCAL_DB_PATH)
+
+
+def sync_replica(replica, events_cache, backend, loader=None):
+    """저장소를 읽어 복제본과 비교하고, 바뀐 행만 로컬에 반영합니다.
+
+    Sheets는 어느 행이 바뀌었는지 알려주지 않으므로, 버전이 바뀌면 events는 표 전체를 다시 받습니다.
+    (로컬에 쓰는 것은 바뀐 행뿐입니다.) memo는 뒤에 추가만 되므로 새 행만 받습니다.
+    loader(ConcurrentLoader)를 주면 events와 memo를 동시에 읽습니다.
+    """
+    generation = replica.write_generation
+    version = backend.data_version()
+    if version is not None and str(version) == replica.get_state("data_version"):
+        # 마지막 동기화 이후 바뀐 것이 없으면 표 전체를 다시 받지 않습니다.
+        replica.mark_synced(version, generation)
+        return
+    # memo는 마지막으로 읽은 행 다음부터만 가져옵니다.
+    memo_start = replica.memo_row_count()
+    reads = (backend.load_events, lambda: backend.load_memos(memo_start))
+    if loader is not None:
+        event_rows, memo_rows = loader.run(*reads)
+    else:
+        event_rows, memo_rows = (read() for read in reads)
+    if replica.apply_events(event_rows, generation):
+        events_cache.invalidate()
+    replica.append_memo(memo_rows)
+    if version is not None:
+        replica.mark_synced(version, generation)
+
+
+@st.cache_resource
+def start_replica_sync(_backend):
+    """백그라운드 동기화 스레드를 프로세스당 한 번만 시작합니다."""
+    replica = get_local_replica()
+    events_cache = get_events_cache()
+    scheduler = get_request_scheduler()
+
+    def loop():
+        # 주기적인 동기화는 화면을 그리는 요청에 할당량을 양보합니다.
+        scheduler.mark_background()
+        while True:
+            wait = (replica.last_synced_at() or 0) + REPLICA_SYNC_INTERVAL - time.time()
+            time.sleep(max(wait, 0))
+            try:
+                sync_replica(replica, events_cache, _backend)
+                if time.time() - float(replica.get_state("memo_archived_at") or 0) > 86400:
+                    archive_old_memos(replica, _backend)
+                archived_at = float(replica.get_state("events_archived_at") or 0)
+                if _backend.archives_events and time.time() - archived_at > 86400:
+                    archive_old_events(replica, events_cache, _backend, get_mutation_queue())
+            except Exception:
+                logger.exception("replica sync failed")
+                time.sleep(REPLICA_SYNC_INTERVAL)
+
+    thread = threading.Thread(target=loop, name="replica-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_synced_replica():
+    """복제본을 반환합니다. 한 번도 동기화된 적이 없으면 먼저 시트에서 채웁니다."""
+    replica = get_local_replica()
+    backend = get_backend()
+    if replica.use_source(backend.source):
+        # 다른 저장소를 따라가던 사본이었으면 비웠으므로 스냅샷도 버립니다.
+        get_events_cache().invalidate()
+    if replica.last_synced_at() is None:
+        sync_replica(replica, get_events_cache(), backend, get_concurrent_loader())
+    elif backend.local:
+        # 로컬 저장소는 읽기가 싸므로 30초 주기를 기다리지 않고 재실행마다 맞춥니다. (안 바뀌었으면 버전만 확인)
+        sync_replica(replica, get_events_cache(), backend)
+    if backend.archives_events and replica.event_archive_catalog() is None:
+        # 보관 시트 목록은 처음 한 번만 받고, 그 뒤로는 하루 한 번 보관 작업 때 갱신합니다.
+        refresh_event_catalog(replica, backend)
+    start_replica_sync(backend)
+    start_write_behind(backend)
+    return replica
+
+
+# -------------------------
+# 메모 보관 (연도별 archive 시트)
+# -------------------------
+
+# 이 기간(일)보다 오래된 메모는 memo 시트에서 memo_archive_YYYY 시트로 옮깁니다.
+MEMO_ARCHIVE_AFTER_DAYS = int(st.secrets.get("memo_archive_after_days", 180))
+MEMO_ARCHIVE_PREFIX = "memo_archive_"
+MEMO_HISTORY_PAGE_SIZE = 20
+
+
+def _memo_time(value):
     try:
-        events_ws = get_events_sheet()
-        rows = events_ws.get_all_records()
+        ts = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=tz.gettz("Asia/Seoul"))
+
+
+def _memo_key(row):
+    timestamp, content = (list(row) + ["", ""])[:2]
+    return str(timestamp), str(content)
+
+
+def archive_old_memos(replica, backend, now=None):
+    """오래된 메모를 연도별 보관 시트로 옮기고 memo 시트에서 지웁니다. 옮긴 행 수를 반환합니다."""
+    now = now or datetime.now(tz=tz.gettz("Asia/Seoul"))
+    cutoff = now - timedelta(days=MEMO_ARCHIVE_AFTER_DAYS)
+
+    # memo는 시간순으로 추가되므로 오래된 메모는 항상 시트 앞쪽에 모여 있습니다.
+    old_rows = []
+    for row in backend.load_memos(0):
+        ts = _memo_time(row[0]) if row else None
+        if ts is None or ts >= cutoff:
+            break
+        old_rows.append((list(row) + [""])[:2])
+    if not old_rows:
+        replica.drop_archived_memos([])
+        return 0
+
+    by_year = {}
+    for row in old_rows:
+        by_year.setdefault(_memo_time(row[0]).year, []).append(row)
+
+    for year, rows in sorted(by_year.items()):
+        # 지난번에 보관 시트에 쓰고 memo 시트에서 지우기 전에 멈췄다면, 같은 행이 보관분 끝에 이미 있습니다.
+        archived = {_memo_key(row) for row in backend.load_memo_archive_tail(year, len(rows))}
+        rows = [row for row in rows if _memo_key(row) not in archived]
+        if rows:
+            backend.append_memo_archive(year, rows)
+
+    # 보관 시트에 다 쓴 뒤에 지웁니다. 도중에 실패해도 메모가 사라지지는 않습니다.
+    backend.delete_memos(len(old_rows))
+    replica.drop_archived_memos(old_rows)
+    list_memo_archives.clear()
+    return len(old_rows)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def list_memo_archives():
+    """보관된 메모가 있는 연도 목록 (최근 연도부터)."""
+    return sorted(get_backend().list_memo_archives(), reverse=True)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_memo_archive_page(year, page):
+    """보관된 메모에서 한 페이지 분량의 행만 읽습니다."""
+    return get_backend().load_memo_archive_page(
+        year, page * MEMO_HISTORY_PAGE_SIZE, MEMO_HISTORY_PAGE_SIZE
+    )
 
+
+# -------------------------
+# 일정 보관 (연도별 events_YYYY 시트)
+# -------------------------
+
+# 끝난 지 이 기간(일)이 지난 일정은 events 시트에서 시작 연도의 events_YYYY 시트로 옮깁니다.
+EVENTS_ARCHIVE_AFTER_DAYS = int(st.secrets.get("events_archive_after_days", 365))
+EVENTS_ARCHIVE_PREFIX = "events_"
+# 보관 시트 목록. 연도마다 옮긴 일정 수와 가장 큰 ID를 적어 둡니다.
+EVENTS_CATALOG_SHEET = "events_catalog"
+EVENT_CATALOG_COLUMNS = ["year", "events", "max_id", "archived_at"]
+# 불러온 보관 연도를 다시 읽기까지의 시간(초). 보관 시트는 거의 바뀌지 않습니다.
+EVENTS_ARCHIVE_TTL = 3600
+
+
+def _events_archive_cutoff(now=None):
+    now = now or datetime.now(tz=tz.gettz("Asia/Seoul"))
+    # 시트의 시각은 벽시계 기준이므로 시간대를 뗀 값과 비교합니다.
+    return (now - timedelta(days=EVENTS_ARCHIVE_AFTER_DAYS)).replace(tzinfo=None)
+
+
+def refresh_event_catalog(replica, backend):
+    """보관 시트 목록을 저장소에서 다시 받아 복제본에 둡니다."""
+    catalog = backend.load_event_catalog()
+    replica.set_event_archive_catalog(catalog)
+    return catalog
+
+
+def _archive_year_for(record, cutoff):
+    """레코드가 있어야 할 보관 연도. events 시트에 두어야 하면 0. (archive_old_events와 같은 기준)"""
+    if record.get("rrule") or record.get("recurrence_id"):
+        return 0
+    df = normalize_events(pd.DataFrame([record]))
+    if df.empty or not df["end"].iloc[0] < cutoff:
+        return 0
+    return df["start"].iloc[0].year
+
+
+def uncount_archived_events(replica, backend, counts):
+    """보관 시트에서 빠진 일정 수(연도 → 개수)만큼 보관 목록의 events를 줄입니다."""
+    catalog = {int(e["year"]): dict(e) for e in backend.load_event_catalog()}
+    for year, count in counts.items():
+        if year in catalog:
+            catalog[year]["events"] = max(0, int(catalog[year]["events"] or 0) - count)
+    entries = sorted(catalog.values(), key=lambda e: e["year"])
+    backend.save_event_catalog(entries)
+    replica.set_event_archive_catalog(entries)
+
+
+def _old_events(replica, queue, cutoff):
+    """복제본에서 옮길 일정: (시작 연도 → 레코드 목록, ID → (0, 행 번호))."""
+    raw = replica.read_events()
+    raw = raw[raw["archive_year"] == 0].reset_index(drop=True)
+    df = normalize_events(raw)
+    old = df.index[(df["end"] < cutoff) & (df["rrule"] == "") & (df["recurrence_id"] == "")]
+    by_year, rows = collections.defaultdict(list), {}
+    for record, start, row_num in zip(
+        raw.loc[old, EVENT_COLUMNS].to_dict("records"), df.loc[old, "start"], raw.loc[old, "row_num"]
+    ):
+        event_id = int(record["id"])
+        if queue.pending_op(event_id) is not None:
+            # 아직 저장되지 않은 작업이 있으면 다음에 옮깁니다.
+            continue
+        record = {col: "" if pd.isna(value) else value for col, value in record.items()}
+        record["id"] = event_id
+        by_year[start.year].append(record)
+        rows[event_id] = (0, int(row_num))
+    return by_year, rows
+
+
+def archive_old_events(replica, events_cache, backend, queue, now=None):
+    """오래된 일정을 시작 연도별 보관 시트로 옮기고 events 시트에서 지웁니다. 옮긴 일정 수를 반환합니다.
+
+    반복 일정과 회차만 고친 일정은 여러 해에 걸쳐 보이므로 events 시트에 그대로 둡니다.
+    지우기 전에 대상 행을 읽어 복제본과 같은 일정이 그 행에 있는지 확인합니다. (쓰기 큐와 같은 방식)
+    """
+    if not backend.archives_events:
+        # 보관 시트가 없는 저장소에서 지우기만 하면 일정이 사라집니다.
+        return 0
+    cutoff = _events_archive_cutoff(now)
+    # 쓰기 큐와 같은 락을 잡아, 옮기는 동안 events 시트의 행 번호가 바뀌지 않게 합니다.
+    with queue.flush_lock:
+        catalog = {int(e["year"]): dict(e) for e in backend.load_event_catalog()}
+        for attempt in range(2):
+            by_year, rows = _old_events(replica, queue, cutoff)
+            current = backend.fetch_current(list(rows), rows) if rows else {}
+            records = {record["id"]: record for records in by_year.values() for record in records}
+            stale = {
+                event_id for event_id, row in current.items()
+                if row is None or _revision_of(row) != _revision_of(records[event_id])
+            }
+            if not stale or attempt:
+                break
+            # 다른 곳에서 행을 넣거나 지웠거나 고쳤습니다. 시트와 맞춘 뒤 한 번 더 고릅니다.
+            sync_replica(replica, events_cache, backend)
+        if stale:
+            # 그래도 맞지 않는 행은 이번에는 건너뛰고 다음 날 다시 봅니다.
+            logger.warning("skipping archive of %d events whose rows changed", len(stale))
+            rows = {event_id: row for event_id, row in rows.items() if event_id not in stale}
+            by_year = {
+                year: [r for r in records if r["id"] not in stale] for year, records in by_year.items()
+            }
+            by_year = {year: records for year, records in by_year.items() if records}
         if not rows:
-            return pd.DataFrame(columns=EVENT_COLUMNS)
+            replica.set_event_archive_catalog(sorted(catalog.values(), key=lambda e: e["year"]), archived=True)
+            return 0
+
+        for year, records in sorted(by_year.items()):
+            if year in catalog:
+                # 지난번에 옮기다 멈췄으면 이미 옮겨진 일정은 다시 붙이지 않습니다.
+                existing = {str(r.get("id")) for r in backend.load_event_archive(year)}
+                records = [r for r in records if str(r["id"]) not in existing]
+            if records:
+                backend.append_event_archive(year, records)
+            entry = catalog.get(year) or {"year": year, "events": 0, "max_id": 0}
+            catalog[year] = {
+                "year": year,
+                "events": int(entry["events"] or 0) + len(records),
+                "max_id": max([int(entry["max_id"] or 0)] + [r["id"] for r in by_year[year]]),
+                "archived_at": datetime.now(tz=tz.gettz("Asia/Seoul")).isoformat(),
+            }
+        entries = sorted(catalog.values(), key=lambda e: e["year"])
+        backend.save_event_catalog(entries)
+
+        # 보관 시트와 목록에 다 쓴 뒤에 지웁니다. 도중에 실패해도 일정이 사라지지는 않습니다.
+        backend.delete_events(list(rows), rows)
+        replica.apply_local((), list(rows))
+        for year in by_year:
+            # 불러 둔 적이 있으면 새로 옮긴 일정까지 다시 읽도록 버립니다.
+            replica.forget_event_archive(year)
+        replica.set_event_archive_catalog(entries, archived=True)
+        events_cache.invalidate()
+    return len(rows)
+
+
+def load_event_archives(window_start, window_end):
+    """달력 창에 걸치는 보관 연도만 복제본에 불러옵니다. 새로 불러온 일정이 있으면 True."""
+    backend = get_backend()
+    # 보관 시트에는 끝난 지 오래된 일정만 있으므로, 그보다 최근 창이면 목록도 보지 않습니다.
+    if not backend.archives_events or window_start.year > _events_archive_cutoff().year:
+        return False
+    replica = get_synced_replica()
+    changed = 0
+    for entry in replica.event_archive_catalog() or []:
+        year = int(entry["year"])
+        if not window_start.year <= year <= window_end.year:
+            continue
+        loaded_at = replica.event_archive_loaded_at(year)
+        if loaded_at is not None and time.time() - loaded_at < EVENTS_ARCHIVE_TTL:
+            continue
+        generation = replica.write_generation
+        changed += replica.apply_events(backend.load_event_archive(year), generation, archive_year=year)
+    if changed:
+        get_events_cache().invalidate()
+    return bool(changed)
 
-        df = pd.DataFrame(rows)
 
-        # 빠진 컬럼 자동 생성
-        for col in EVENT_COLUMNS:
-            if col not in df.columns:
-                df[col] = None
+# -------------------------
+# 쓰기 큐 (write-behind)
+# -------------------------
+
+# 쓰기 큐를 비우는 주기(초)와, 이만큼 쌓이면 기다리지 않고 바로 비우는 기준
+WRITE_FLUSH_INTERVAL = 1.0
+WRITE_FLUSH_THRESHOLD = 50
+# 세션마다 쌓아 두는 저장 실패 메시지 수. 다시 접속하지 않는 세션의 메시지가 계속 쌓이지 않도록 자릅니다.
+FAILURES_PER_SESSION = 20
+
+WRITE_KIND_LABELS = {"insert": "추가를", "update": "수정을", "delete": "삭제를"}
+WRITE_CONFLICT_MESSAGE = "다른 곳에서 먼저 수정된 일정입니다. 최신 내용을 확인한 뒤 다시 시도해 주세요."
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def _is_transient_error(error):
+    """다시 시도하면 될 수 있는 오류인지. (할당량 초과, 5xx, 네트워크 오류)"""
+    if isinstance(error, gspread.exceptions.APIError):
+        return _api_status_code(error) in RETRYABLE_STATUS_CODES
+    return isinstance(error, (requests.exceptions.RequestException, ConnectionError, TimeoutError))
+
+
+class WriteAheadLog:
+    """시트에 보내기 전에 모든 쓰기를 먼저 남겨 두는 로컬 기록 (복제본과 같은 SQLite 파일).
+
+    저장이 끝난 항목만 지우므로, 시트가 안 되거나 앱이 다시 시작돼도 남은 쓰기를 순서대로 다시 보냅니다.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        # 메모를 올리는 곳(저장 버튼, 저장 스레드)이 같은 메모를 동시에 올리지 않도록 합니다.
+        self.memo_lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS write_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT,
+                    event_id INTEGER,
+                    payload TEXT,
+                    created_at REAL
+                )
+                """
+            )
+
+    def append(self, kind, event_id, payload=None):
+        """쓰기 하나를 남기고 그 seq를 반환합니다."""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "INSERT INTO write_log (kind, event_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                (kind, event_id, json.dumps(payload, ensure_ascii=False, default=str), time.time()),
+            ).lastrowid
+
+    def append_many(self, kind, records):
+        """같은 종류의 쓰기 여러 개를 한 트랜잭션으로 남깁니다. (일정 가져오기)"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO write_log (kind, event_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (kind, record["id"], json.dumps(record, ensure_ascii=False, default=str), now)
+                    for record in records
+                ],
+            )
+
+    def last_seq(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM write_log").fetchone()[0]
+
+    def entries(self, memo=False):
+        """남아 있는 (seq, 종류, 일정 ID, 내용)을 기록된 순서대로. memo=True면 메모만, 아니면 일정만."""
+        op = "=" if memo else "!="
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT seq, kind, event_id, payload FROM write_log WHERE kind {op} 'memo' ORDER BY seq"
+            ).fetchall()
+        return [(seq, kind, event_id, json.loads(payload)) for seq, kind, event_id, payload in rows]
+
+    def discard(self, event_ids, through=None):
+        """event_ids의 기록을 지웁니다. through를 주면 그 seq까지만 지웁니다."""
+        through = through if through is not None else 2 ** 62
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM write_log WHERE event_id = ? AND seq <= ?",
+                [(event_id, through) for event_id in event_ids],
+            )
+
+    def discard_seq(self, seq):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM write_log WHERE seq = ?", (seq,))
+
+
+@st.cache_resource
+def get_write_log():
+    return WriteAheadLog(LOCAL_DB_PATH)
+
+
+class MutationQueue:
+    """일정 추가/수정/삭제를 모아 두었다가 한꺼번에 시트에 반영합니다."""
+
+    def __init__(self, log=None):
+        self.lock = threading.Lock()
+        # 들어온 작업을 먼저 남겨 두는 WriteAheadLog. 없으면 메모리에만 둡니다.
+        self.log = log
+        # 일정 ID → (종류, 레코드). 같은 ID에 대한 작업은 하나로 합칩니다.
+        self.pending = {}
+        self.wakeup = threading.Event()
+        # 저장을 한 번에 한 곳(백그라운드 스레드 또는 sync 모드의 스크립트)에서만 하도록 합니다.
+        self.flush_lock = threading.Lock()
+        # 일정 ID → 그 작업을 만든 세션. 저장이 끝나거나 되돌릴 때까지 유지합니다.
+        self.owners = {}
+        # 세션 → 아직 보여주지 않은 저장 실패 메시지 (세션마다 최근 FAILURES_PER_SESSION개까지)
+        self.failures = collections.defaultdict(lambda: collections.deque(maxlen=FAILURES_PER_SESSION))
+        # 일시적인 오류로 저장이 미뤄지고 있는지
+        self.retrying = False
+        # 추가를 보내다 일시적인 오류가 났는지. 응답만 못 받고 시트에는 붙었을 수 있습니다.
+        self.unconfirmed_inserts = False
+
+    def _stale(self, event_id, kind, record):
+        """이미 쌓인 작업이 저장된 뒤의 리비전이 아닌 다른 리비전을 보고 만든 수정/삭제인지.
+
+        두 세션이 같은 일정을 같은 리비전에서 고치면, 나중 작업은 합치지 않고 충돌로 버려야 합니다.
+        """
+        prev = self.pending.get(event_id)
+        if prev is None or prev[0] == "delete":
+            return False
+        expected = _expected_revision(kind, record)
+        return expected is not None and expected != prev[1]["revision"]
+
+    def _fail(self, owner, event_id, kind, record, reason):
+        title = (record or {}).get("title") or f"#{event_id}"
+        message = f"'{title}' {WRITE_KIND_LABELS.get(kind, kind)} 저장하지 못해 되돌렸습니다: {reason}"
+        if owner is None:
+            # WAL에서 되살린 작업처럼 만든 세션이 없으면 보여줄 곳이 없으므로 로그로만 남깁니다.
+            logger.warning("dropped write without a session: %s", message)
+            return
+        self.failures[owner].append(message)
+
+    def _merge(self, event_id, kind, record):
+        """작업을 쌓인 작업에 합칩니다. 다른 리비전을 보고 만든 작업이면 합치지 않고 False."""
+        if self._stale(event_id, kind, record):
+            return False
+        prev = self.pending.pop(event_id, None)
+        prev_kind = prev[0] if prev else None
+        if prev_kind == "delete":
+            self.pending[event_id] = prev
+        elif prev_kind == "insert" and kind == "delete":
+            # 시트에 들어가기 전에 지워진 일정은 아무 요청도 필요 없습니다.
+            if self.log is not None:
+                self.log.discard([event_id])
+        elif prev_kind == "insert":
+            self.pending[event_id] = ("insert", {**record, "revision": prev[1]["revision"]})
+        elif prev_kind == "update":
+            # 합친 작업은 시트에서 처음 작업과 같은 리비전을 기대합니다.
+            revision = prev[1]["revision"]
+            if kind == "delete":
+                record = {**(record or {"id": event_id}), "revision": revision - 1}
+            else:
+                record = {**record, "revision": revision}
+            self.pending[event_id] = (kind, record)
+        else:
+            self.pending[event_id] = (kind, record)
+        return True
+
+    def put(self, kind, event_id, record=None, owner=None):
+        with self.lock:
+            if self._stale(event_id, kind, record):
+                # 기록에도 남기지 않고 바로 알립니다. 먼저 쌓인 작업과 그 세션은 그대로 둡니다.
+                self._fail(owner, event_id, kind, record, WRITE_CONFLICT_MESSAGE)
+                return
+            if self.log is not None:
+                # 기록이 남은 뒤에야 큐에 넣습니다. take()의 기록 위치와 순서가 어긋나지 않도록 락 안에서 씁니다.
+                self.log.append(kind, event_id, record)
+            self._merge(event_id, kind, record)
+            self.owners[event_id] = owner
+            if len(self.pending) >= WRITE_FLUSH_THRESHOLD:
+                self.wakeup.set()
+
+    def put_many(self, kind, records, owner=None):
+        """레코드 여러 개를 한 번에 넣습니다. 기록도 한 번에 남기고, 바로 비우도록 깨웁니다."""
+        with self.lock:
+            if self.log is not None:
+                self.log.append_many(kind, records)
+            for record in records:
+                self._merge(record["id"], kind, record)
+                self.owners[record["id"]] = owner
+            self.wakeup.set()
+
+    def take(self):
+        """쌓인 작업과, 그 작업들이 남은 기록의 마지막 seq를 꺼냅니다."""
+        with self.lock:
+            ops = list(self.pending.items())
+            self.pending = {}
+            return ops, self.log.last_seq() if self.log is not None else None
+
+    def replay(self):
+        """기록에 남은(아직 저장되지 않은) 작업을 큐에 다시 넣습니다. 일정 ID 중 가장 큰 값을 반환합니다."""
+        if self.log is None:
+            return 0
+        entries = self.log.entries()
+        with self.lock:
+            for _, kind, event_id, record in entries:
+                if not self._merge(event_id, kind, record):
+                    # 남은 기록은 먼저 쌓인 작업이 끝날 때 같이 지워집니다.
+                    self._fail(None, event_id, kind, record, WRITE_CONFLICT_MESSAGE)
+                self.owners.setdefault(event_id, None)
+        if entries:
+            logger.info("replaying %d logged writes", len(entries))
+        return max((event_id for _, _, event_id, _ in entries), default=0)
+
+    def settle(self, event_ids, through):
+        """저장이 끝났거나 버린 작업의 기록을 through까지 지웁니다."""
+        if self.log is not None and event_ids:
+            self.log.discard(event_ids, through)
+
+    def restore(self, ops):
+        """실패한 작업을 되돌려 넣습니다. 그 사이에 들어온 작업이 뒤에 합쳐집니다."""
+        with self.lock:
+            newer = list(self.pending.items())
+            self.pending = {}
+            for event_id, (kind, record) in ops + newer:
+                if not self._merge(event_id, kind, record):
+                    # 저장이 미뤄진 작업과 같은 리비전에서 만든 새 작업은 충돌입니다.
+                    self._fail(self.owners.get(event_id), event_id, kind, record, WRITE_CONFLICT_MESSAGE)
+
+    def resolve(self, event_ids):
+        """저장이 끝난 작업의 세션 기록을 지웁니다. 그 사이 같은 ID로 새 작업이 들어왔으면 남겨 둡니다."""
+        with self.lock:
+            for event_id in event_ids:
+                if event_id not in self.pending:
+                    self.owners.pop(event_id, None)
+
+    def reject(self, ops, reason):
+        """저장할 수 없는 작업을 버리고(화면에서는 원래대로 되돌아감) 만든 세션에 알립니다."""
+        with self.lock:
+            for event_id, (kind, record) in ops:
+                owner = self.owners.pop(event_id, None) if event_id not in self.pending else None
+                self._fail(owner, event_id, kind, record, reason)
+
+    def pop_failures(self, session_id):
+        with self.lock:
+            return list(self.failures.pop(session_id, ()))
+
+    def in_flight(self, session_id):
+        """session_id가 만든 작업 중 아직 저장되지 않은 것의 수."""
+        with self.lock:
+            return sum(1 for owner in self.owners.values() if owner == session_id)
+
+    def has_pending(self):
+        with self.lock:
+            return bool(self.pending)
+
+    def pending_op(self, event_id):
+        """event_id에 대해 아직 시트에 반영되지 않은 (종류, 레코드). 없으면 None."""
+        with self.lock:
+            return self.pending.get(event_id)
+
+    def overlay(self, df, expand=None):
+        """아직 시트에 반영되지 않은 작업을 스냅샷 위에 덮어 보여줍니다.
+
+        expand를 주면 덮어쓸 레코드(정규화된 DataFrame)와 저장 전인 recurrence_id 집합을 넘겨
+        화면용으로 바꾼 뒤 붙입니다. (반복 일정 펼치기)
+        """
+        with self.lock:
+            ops = list(self.pending.items())
+        if not ops:
+            return df
+        records = [record for _, (kind, record) in ops if kind != "delete"]
+        # 회차만 고친 일정이 아직 저장 전이면, 펼쳐 둔 원래 회차를 숨깁니다.
+        overrides = {record["recurrence_id"] for record in records if record.get("recurrence_id")}
+        df = df[~df["id"].isin([event_id for event_id, _ in ops])]
+        if overrides and len(df):
+            df = df[~_occurrence_ids(df).isin(overrides)]
+        if records:
+            new_rows = normalize_events(pd.DataFrame(records))
+            df = _append_events(df, expand(new_rows, overrides) if expand else new_rows)
+        return df
+
 
+@st.cache_resource
+def get_mutation_queue():
+    return MutationQueue(get_write_log())
+
+
+def _revision_of(record):
+    try:
+        return int(float(record.get("revision") or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _expected_revision(kind, record):
+    """작업이 시트에서 기대하는 리비전. None이면 확인하지 않습니다."""
+    if kind == "update":
+        return record["revision"] - 1
+    if kind == "delete":
+        return (record or {}).get("revision")
+    return None
+
+
+def _same_write(current, record):
+    """시트의 행이 이 레코드를 저장한 결과인지. (기록에서 다시 보낸 작업이 이미 반영된 경우)"""
+    return bool(record and record.get("updated_at")) and (
+        str(current.get("updated_at")) == str(record["updated_at"])
+        and _revision_of(current) == record["revision"]
+    )
+
+
+def _current_rows(ops, events_cache, replica, backend):
+    """작업 대상의 행 번호와, 그 행에 지금 저장된 레코드(행에 그 ID가 없으면 None)."""
+    ids = [event_id for event_id, _ in ops]
+    for attempt in range(2):
+        rows = events_cache.rows_for(ids, replica.read_events)
+        current = backend.fetch_current([i for i in ids if rows[i] is not None], rows)
+        stale = any(record is None for record in current.values()) or any(
+            rows[event_id] is None for event_id, (kind, _) in ops if kind != "insert"
+        )
+        if not stale or attempt:
+            break
+        # 다른 곳에서 행을 지워 행 번호가 밀렸거나 복제본이 뒤처졌습니다. 시트와 맞춘 뒤 한 번 더 봅니다.
+        sync_replica(replica, events_cache, backend)
+    return rows, current
+
+
+def flush_mutations(queue, events_cache, replica, backend):
+    """큐에 쌓인 작업을 수정 1회, 삭제 1회, 추가 1회의 요청으로 저장소에 반영합니다.
+
+    수정/삭제는 대상 행을 먼저 읽어, 작업을 만들 때 본 리비전 그대로일 때만 반영합니다.
+    그 사이 다른 곳에서 고쳤으면 작업을 버리고 알린 뒤, 모든 세션의 스냅샷을 새로 맞춥니다.
+    일시적인 오류면 작업을 큐에 되돌려 다음에 다시 시도하고, 그 밖의 오류면 그 단계의 작업을
+    버리고(화면은 원래대로 되돌아감) 작업을 만든 세션에 알립니다.
+    기록에서 다시 보낸 작업이 이미 반영돼 있으면 끝난 것으로 보고, 이미 없는 일정의 삭제도 끝난 것으로 봅니다.
+    추가하려는 ID에 다른 내용의 일정이 이미 있으면(다른 곳에서 같은 ID를 씀) 덮어쓰지 않고 충돌로 버립니다.
+    추가 단계가 일시적인 오류로 끝났으면 시트에 이미 붙었을 수 있으므로, 다시 보내기 전에 시트와 맞춰 봅니다.
+    보관 시트의 일정을 더는 그 해에 두지 않을 내용(최근 시각, 다른 연도 등)으로 고치면 events 시트에 붙인 뒤
+    보관 시트에서 지웁니다. 오래된 일정이면 다음 보관 작업이 맞는 연도로 다시 옮깁니다.
+    """
+    with queue.flush_lock:
+        ops, through = queue.take()
+        if not ops:
+            return
+        done_records, done_deletes = [], []
+        gone, missing = set(), set()
         try:
-            df["id"] = df["id"].astype(int)
-        except:
-            pass
+            if queue.unconfirmed_inserts and any(kind != "delete" for _, (kind, _) in ops):
+                # 복제본에 없는 ID는 fetch_current로 확인되지 않으므로, 먼저 시트를 다시 읽어 행 번호를 받습니다.
+                sync_replica(replica, events_cache, backend)
+                queue.unconfirmed_inserts = False
+            rows, current = _current_rows(ops, events_cache, replica, backend)
+            stages = {"update": [], "delete": [], "insert": []}
+            conflicts = []
+            for event_id, (kind, record) in ops:
+                row = current.get(event_id)
+                if row is not None and _same_write(row, record):
+                    done_records.append(record)
+                elif kind == "insert":
+                    (stages["insert"] if row is None else conflicts).append((event_id, (kind, record)))
+                elif row is None:
+                    (gone if kind == "delete" else missing).add(event_id)
+                elif _expected_revision(kind, record) not in (None, _revision_of(row)):
+                    conflicts.append((event_id, (kind, record)))
+                else:
+                    stages[kind].append((event_id, (kind, record)))
+            cutoff = _events_archive_cutoff()
+            moving = {
+                event_id for event_id, (_, record) in stages["update"]
+                if rows[event_id][0] and _archive_year_for(record, cutoff) != rows[event_id][0]
+            }
+            stages["move"] = [(event_id, op) for event_id, op in stages["update"] if event_id in moving]
+            stages["update"] = [(event_id, op) for event_id, op in stages["update"] if event_id not in moving]
+            if missing:
+                logger.warning("dropping writes for events missing from the sheet: %s", sorted(missing))
+                queue.reject(
+                    [(event_id, op) for event_id, op in ops if event_id in missing],
+                    "다른 곳에서 이미 삭제된 일정입니다.",
+                )
+            if conflicts:
+                logger.warning("dropping conflicting writes: %s", sorted(i for i, _ in conflicts))
+                queue.reject(conflicts, WRITE_CONFLICT_MESSAGE)
+                missing |= {event_id for event_id, _ in conflicts}
+                # 다른 세션들도 다음 화면에서 바뀐 내용을 보도록 공유 스냅샷을 버리고 시트와 다시 맞춥니다.
+                events_cache.invalidate()
+                sync_replica(replica, events_cache, backend)
+
+            for kind in ("update", "delete", "insert", "move"):
+                stage_ops = stages[kind]
+                if not stage_ops:
+                    continue
+                try:
+                    if kind == "update":
+                        backend.update_events([record for _, (_, record) in stage_ops], rows)
+                        done_records += [record for _, (_, record) in stage_ops]
+                    elif kind == "delete":
+                        backend.delete_events([event_id for event_id, _ in stage_ops], rows)
+                        done_deletes += [event_id for event_id, _ in stage_ops]
+                    elif kind == "insert":
+                        backend.insert_events([record for _, (_, record) in stage_ops])
+                        done_records += [record for _, (_, record) in stage_ops]
+                    else:
+                        # 먼저 events 시트에 붙이고 나서 보관 시트에서 지웁니다. 도중에 멈춰도 일정이 사라지지 않습니다.
+                        backend.insert_events([record for _, (_, record) in stage_ops])
+                        backend.delete_events([event_id for event_id, _ in stage_ops], rows)
+                        done_deletes += [event_id for event_id, _ in stage_ops]
+                        done_records += [record for _, (_, record) in stage_ops]
+                except Exception as e:
+                    if isinstance(e, PartialInsertError):
+                        if kind == "insert":
+                            # 앞쪽 묶음은 이미 시트에 붙었으므로 끝난 것으로 두고, 나머지만 다시 보내거나 버립니다.
+                            done_records += [record for _, (_, record) in stage_ops[:e.written]]
+                            stage_ops = stage_ops[e.written:]
+                        e = e.__cause__
+                    if _is_transient_error(e):
+                        if kind in ("insert", "move"):
+                            queue.unconfirmed_inserts = True
+                        raise
+                    logger.exception("write flush rejected by the backend")
+                    queue.reject(stage_ops, str(e))
+                    missing |= {event_id for event_id, _ in stage_ops}
+            done_deleted = set(done_deletes)
+            unarchived = collections.Counter(
+                rows[event_id][0] for event_id, _ in stages["delete"] + stages["move"]
+                if rows[event_id][0] and event_id in done_deleted
+            )
+            if unarchived:
+                try:
+                    uncount_archived_events(replica, backend, unarchived)
+                except Exception:
+                    # 일정은 이미 저장됐으므로 되돌리지 않고, 보관 목록의 개수만 어긋난 채로 남깁니다.
+                    logger.exception("could not update the events catalog counts")
+            queue.retrying = False
+        except Exception:
+            logger.exception("write flush failed; will retry")
+            queue.retrying = True
+            done_ids = set(done_deletes) | {record["id"] for record in done_records} | gone
+            queue.restore([
+                (event_id, op) for event_id, op in ops
+                if event_id not in done_ids and event_id not in missing
+            ])
+        finally:
+            replica.apply_local(done_records, done_deletes)
+            events_cache.apply(done_records, done_deletes)
+            done_ids = set(done_deletes) | {record["id"] for record in done_records} | gone
+            queue.resolve(done_ids)
+            queue.settle(done_ids | missing, through)
+
+
+def flush_memos(log, replica, backend):
+    """시트에 올리지 못하고 기록에 남은 메모를 남은 순서대로 올립니다."""
+    with log.memo_lock:
+        entries = log.entries(memo=True)
+        if not entries:
+            return
+        # 올린 뒤 기록을 지우기 전에 멈췄을 수 있으므로, 기록할 때 이후로 시트에 붙은 메모는 건너뜁니다.
+        start = min([memo.get("after", 0) for _, _, _, memo in entries] + [replica.memo_row_count()])
+        uploaded = {(str(row[0]), str(row[1])) for row in backend.load_memos(start) if len(row) >= 2}
+        for seq, _, _, memo in entries:
+            if (memo["timestamp"], memo["content"]) not in uploaded:
+                backend.append_memo(memo["timestamp"], memo["content"])
+            log.discard_seq(seq)
+
+
+@st.cache_resource
+def start_write_behind(_backend):
+    """쓰기 큐를 주기적으로 비우는 스레드를 프로세스당 한 번만 시작합니다.
+
+    지난번에 저장하지 못하고 기록에 남은 작업은 먼저 큐에 다시 넣습니다.
+    """
+    queue = get_mutation_queue()
+    events_cache = get_events_cache()
+    replica = get_local_replica()
+    replayed = queue.replay()
+    get_id_allocator().reserve(replayed)
+
+    def loop():
+        # 다시 보낼 작업이 있으면 먼저 시트와 맞춰 봐야 이미 반영된 작업을 가려낼 수 있습니다.
+        needs_sync = bool(replayed)
+        while True:
+            queue.wakeup.wait(WRITE_FLUSH_INTERVAL)
+            queue.wakeup.clear()
+            if needs_sync:
+                try:
+                    sync_replica(replica, events_cache, _backend)
+                    needs_sync = False
+                except Exception:
+                    logger.exception("replica sync before replay failed; will retry")
+                    continue
+            flush_mutations(queue, events_cache, replica, _backend)
+            try:
+                flush_memos(queue.log, replica, _backend)
+            except Exception:
+                logger.exception("memo flush failed; will retry")
+
+    thread = threading.Thread(target=loop, name="write-behind", daemon=True)
+    thread.start()
+    return thread
+
+
+def enqueue_mutation(kind, event_id, record=None):
+    backend = get_backend()
+    start_write_behind(backend)
+    queue = get_mutation_queue()
+    queue.put(kind, event_id, record, owner=_session_id())
+    if WRITE_MODE == "sync":
+        # 저장까지 기다립니다. 실패하면 다음 화면에서 바로 알려줍니다.
+        flush_mutations(queue, get_events_cache(), get_local_replica(), backend)
+
+
+def enqueue_mutations(kind, records):
+    """같은 종류의 작업 여러 개를 한 번에 큐에 넣습니다. 저장은 종류별 요청 1번(추가는 나눠 붙이기)으로 합니다."""
+    backend = get_backend()
+    start_write_behind(backend)
+    queue = get_mutation_queue()
+    queue.put_many(kind, records, owner=_session_id())
+    if WRITE_MODE == "sync":
+        flush_mutations(queue, get_events_cache(), get_local_replica(), backend)
+
+
+# -------------------------
+# 일정 DB 함수
+# -------------------------
+
+def _event_record(event_id, title, start, end, all_day, color, description, attendee,
+                  rrule="", exdates="", recurrence_id="", revision=1):
+    return {
+        "id": event_id,
+        "title": title,
+        "start": start,
+        "end": end,
+        "all_day": int(all_day),
+        "color": color,
+        "description": description or "",
+        "attendee": attendee,
+        "rrule": rrule or "",
+        "exdates": exdates or "",
+        "recurrence_id": recurrence_id or "",
+        "revision": revision,
+        "updated_at": datetime.now(tz=tz.gettz("Asia/Seoul")).isoformat(),
+    }
 
-        return df[EVENT_COLUMNS]
+
+def _fresh_snapshot(cache):
+    # 락을 잡은 채로 불러와서 여러 세션이 동시에 시트를 읽지 않도록 합니다.
+    with cache.lock:
+        if not cache.is_fresh():
+            df = _load_events()
+            if df is None:
+                return None
+            cache.set(df)
+        return cache.df
+
+
+class RerunSnapshot:
+    """재실행 1번 동안 화면 코드가 같이 쓰는 events 스냅샷.
+
+    공유 캐시는 재실행 시작 때 한 번만 확인하고, 구간 인덱스와 ID 인덱스도 그때 받아 둡니다.
+    반환하는 DataFrame은 공유되므로 직접 수정하지 마세요.
+    """
+
+    def __init__(self, cache, queue):
+        self.queue = queue
+        with cache.lock:
+            self.df = _fresh_snapshot(cache)
+            self.version = cache.version
+            if self.df is not None:
+                self.index = cache.interval_index()
+                self.series = cache.series_index()
+                self.positions = cache.id_positions()
+
+    def in_range(self, window_start, window_end, remember=True) -> pd.DataFrame:
+        """[window_start, window_end)와 겹치는 일정만 반환합니다."""
+        if self.df is None:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        positions = self.index.query(window_start, window_end)
+        # 반복 일정은 이 창에 걸리는 회차만 펼쳐서 붙입니다.
+        df = _append_events(
+            self.df.iloc[positions], self.series.expand(window_start, window_end, remember)
+        )
+        # 아직 시트에 반영되지 않은 내 쓰기도 바로 보이도록 합니다.
+        return self.queue.overlay(
+            df,
+            expand=lambda new_rows, overrides: _append_events(
+                new_rows[new_rows["rrule"] == ""],
+                SeriesIndex(new_rows, None, self.series.overrides | overrides).expand(
+                    window_start, window_end, remember=False
+                ),
+            ),
+        )
+
+    def get(self, event_id):
+        """ID로 일정 1개(행)를 찾습니다. 없거나 지워지는 중이면 None."""
+        pending = self.queue.pending_op(event_id)
+        if pending is not None:
+            kind, record = pending
+            return None if kind == "delete" else normalize_events(pd.DataFrame([record])).iloc[0]
+        pos = self.positions.get(event_id) if self.df is not None else None
+        return None if pos is None else self.df.iloc[pos]
+
+    def conflicts(self, slots, attendees, exclude_id=None) -> pd.DataFrame:
+        """slots [(시작, 종료), ...] 중 하나라도 겹치는 attendees의 일정.
+
+        슬롯 전체를 덮는 구간으로 인덱스를 한 번만 조회하고(O(log n + k)), 그렇게 나온 k개 후보만
+        정렬한 m개 슬롯과 비교합니다(O((m + k) log m)). exclude_id를 주면 그 일정과, 그 일정이
+        반복 일정일 때 회차만 따로 고친 일정들(overrides_of)도 뺍니다.
+        """
+        if not slots:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        slots = sorted((pd.Timestamp(start), pd.Timestamp(end)) for start, end in slots)
+        df = self.in_range(slots[0][0], max(end for _, end in slots), remember=False)
+        df = df[df["attendee"].isin(attendees)]
+        if exclude_id is not None:
+            # 저장 전인 회차 수정도 빠지도록 recurrence_id로 거릅니다. (overrides_of와 같은 기준)
+            df = df[(df["id"] != exclude_id) & ~df["recurrence_id"].str.startswith(f"{exclude_id}@")]
+        if df.empty:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        starts = np.array([start for start, _ in slots], dtype="datetime64[ns]")
+        # 시작 순으로 정렬한 슬롯의 종료 시각 누적 최댓값: 후보보다 먼저 시작한 슬롯 중 가장 늦게 끝나는 시각
+        reach = np.maximum.accumulate(np.array([end for _, end in slots], dtype="datetime64[ns]"))
+        # 후보 종료 시각보다 먼저 시작한 슬롯 수. 경계만 맞닿은 일정(종료 = 시작)은 겹치지 않는 것으로 봅니다.
+        before = np.searchsorted(starts, df["end"].to_numpy(dtype="datetime64[ns]"), side="left")
+        mask = before > 0
+        mask[mask] = reach[before[mask] - 1] > df["start"].to_numpy(dtype="datetime64[ns]")[mask]
+        found = df[mask]
+        return found.drop_duplicates(subset=["id", "start"]).sort_values("start")
+
+    def overrides_of(self, series_id):
+        """반복 일정에서 회차만 따로 고친 일정들의 ID."""
+        if self.df is None:
+            return []
+        mask = self.df["recurrence_id"].str.startswith(f"{series_id}@")
+        return [int(i) for i in self.df.loc[mask, "id"].dropna()]
+
+
+def fetch_rerun_snapshot():
+    return RerunSnapshot(get_events_cache(), get_mutation_queue())
+
+
+def _is_streamlit_stop(e):
+    # StopException의 모듈 경로로 확인 (streamlit.runtime.scriptrunner 관련)
+    exception_type = type(e)
+    exception_module = getattr(exception_type, '__module__', '')
+    exception_name = exception_type.__name__
+    return 'streamlit' in exception_module and 'Stop' in exception_name
+
+
+def prefetch_data():
+    """화면을 그리기 전에 시트 연결과 첫 동기화를 끝내 둡니다. (events/memo는 동시에 읽음)
+
+    실패해도 여기서는 넘어가고, 각 화면 함수가 다시 시도하면서 오류를 보여줍니다.
+    """
+    try:
+        get_synced_replica()
+    except Exception as e:
+        if _is_streamlit_stop(e):
+            raise
+        logger.exception("prefetch failed")
+
+
+def _load_events():
+    try:
+        df = get_synced_replica().read_events()
+
+        return df
     except Exception as e:
         # StopException은 get_events_sheet()에서 st.stop()이 호출되었을 때 발생
         # 앱을 중단하기 위해 다시 발생시킴
-        # StopException의 모듈 경로로 확인 (streamlit.runtime.scriptrunner 관련)
-        exception_type = type(e)
-        exception_module = getattr(exception_type, '__module__', '')
-        exception_name = exception_type.__name__
-        
-        # Streamlit의 StopException인지 확인
-        if 'streamlit' in exception_module and 'Stop' in exception_name:
+        if _is_streamlit_stop(e):
             raise
         st.error(f"일정을 불러오는 중 오류가 발생했습니다: {str(e)}")
-        return pd.DataFrame(columns=EVENT_COLUMNS)
+        # 오류 결과는 캐시하지 않음
+        return None
+
+
+class EventIdAllocator:
+    """새 일정 ID 발급기. 락 안에서 증가시키므로 동시에 추가해도 ID가 겹치지 않습니다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_id = 0
+
+    def next_id(self, replica):
+        # 복제본의 최대 ID(기본키 인덱스 조회)와 비교해 다른 곳에서 추가된 ID도 건너뜁니다.
+        # 불러오지 않은 보관 연도의 ID는 보관 시트 목록의 최대 ID로 건너뜁니다.
+        with self.lock:
+            self.last_id = max(self.last_id, replica.max_event_id(), replica.archived_max_event_id()) + 1
+            return self.last_id
+
+    def next_ids(self, replica, count):
+        """ID count개를 한 번에 이어서 발급합니다. (일정 가져오기)"""
+        with self.lock:
+            first = max(self.last_id, replica.max_event_id(), replica.archived_max_event_id()) + 1
+            self.last_id = first + count - 1
+            return range(first, first + count)
+
+    def reserve(self, event_id):
+        """아직 복제본에 없는 ID(기록에서 다시 보낼 추가 등)를 다시 발급하지 않도록 합니다."""
+        with self.lock:
+            self.last_id = max(self.last_id, event_id)
+
+
+@st.cache_resource
+def get_id_allocator():
+    return EventIdAllocator()
+
+
+def insert_event(title, start, end, all_day, color, description, attendee, **recurrence):
+    new_id = get_id_allocator().next_id(get_synced_replica())
+    record = _event_record(new_id, title, start, end, all_day, color, description, attendee, **recurrence)
+    enqueue_mutation("insert", new_id, record)
+
+
+def update_event(event_id, title, start, end, all_day, color, description, attendee,
+                 base_revision=0, **recurrence):
+    """일정을 고칩니다. base_revision은 고치기 시작할 때 본 리비전으로, 저장할 때 시트와 비교합니다."""
+    record = _event_record(
+        event_id, title, start, end, all_day, color, description, attendee,
+        revision=base_revision + 1, **recurrence,
+    )
+    enqueue_mutation("update", event_id, record)
+
+
+def _resave_row(row, **changes):
+    """스냅샷의 행(row)을 changes만 바꿔 다시 저장합니다. 그 행의 리비전을 기준으로 합니다."""
+    values = {
+        "title": row["title"],
+        "start": occurrence_key(row["start"]),
+        "end": occurrence_key(row["end"]),
+        "all_day": bool(row["all_day"]),
+        "color": row["color"] if isinstance(row["color"], str) else "",
+        "description": row["description"],
+        "attendee": row["attendee"],
+        "rrule": row["rrule"],
+        "exdates": row["exdates"],
+        "recurrence_id": row["recurrence_id"],
+    }
+    values.update(changes)
+    update_event(int(row["id"]), base_revision=int(row["revision"]), **values)
+
+
+def skip_occurrence(row, occurrence):
+    """반복 일정(row)에서 occurrence 회차 하나만 뺍니다."""
+    _resave_row(row, exdates=",".join(filter(None, [row["exdates"], occurrence])))
+
+
+def shift_occurrence_keys(text, delta):
+    """exdates 같은 회차 목록을 delta만큼 옮깁니다. 반복 일정의 시작 시각을 바꿀 때 씁니다."""
+    return ",".join(sorted(occurrence_key(pd.Timestamp(key) + delta) for key in _exdate_keys(text)))
+
+
+def rekey_overrides(series_id, delta, snapshot):
+    """반복 일정의 시작이 delta만큼 옮겨졌을 때, 회차만 고친 일정들이 옮겨진 회차를 가리키게 합니다."""
+    for override_id in snapshot.overrides_of(series_id):
+        row = snapshot.get(override_id)
+        if row is None or "@" not in row["recurrence_id"]:
+            continue
+        key = row["recurrence_id"].split("@", 1)[1]
+        _resave_row(row, recurrence_id=f"{series_id}@{occurrence_key(pd.Timestamp(key) + delta)}")
+
+
+def delete_event(event_id, revision=None):
+    """일정을 지웁니다. revision을 주면 시트의 리비전이 그대로일 때만 지웁니다."""
+    enqueue_mutation("delete", event_id, {"id": event_id, "revision": revision})
+
 
+# -------------------------
+# 일정 가져오기 (ICS / CSV)
+# -------------------------
+
+# CSV 머리글 → 일정 열. EVENT_COLUMNS 이름은 그대로 받고, 한글 머리글도 받습니다.
+IMPORT_COLUMN_ALIASES = {
+    "약속명": "title",
+    "제목": "title",
+    "시작": "start",
+    "종료": "end",
+    "종일": "all_day",
+    "메모": "description",
+    "참석자": "attendee",
+    "반복": "rrule",
+    "빠진 회차": "exdates",
+}
+# 오류 메시지는 앞에서 이만큼만 보여줍니다.
+IMPORT_ERROR_LIMIT = 5
 
-def _get_new_event_id(events_ws):
-    col = events_ws.col_values(1)
-    if len(col) <= 1:
-        return 1
 
-    ids = []
-    for v in col[1:]:
+def _import_datetime(value):
+    """가져온 시각 문자열 → (한국시간 naive datetime, 날짜만 있었는지)."""
+    value = str(value or "").strip()
+    if not value:
+        return None, False
+    if re.fullmatch(r"\d{8}", value):
+        return datetime.strptime(value, "%Y%m%d"), True
+    if re.fullmatch(r"\d{8}T\d{6}Z?", value):
+        parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+        if value.endswith("Z"):
+            parsed = parsed.replace(tzinfo=tz.UTC)
+    else:
         try:
-            ids.append(int(v))
-        except:
-            pass
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"시각을 읽을 수 없습니다: {value}") from None
+        if len(value) == 10:
+            return parsed, True
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(tz.gettz("Asia/Seoul")).replace(tzinfo=None)
+    return parsed, False
 
-    return max(ids) + 1 if ids else 1
 
+def _ics_text(value):
+    # \n, \N은 줄바꿈, 나머지(\, \; \\)는 뒤 글자 그대로
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
 
-def insert_event(title, start, end, all_day, color, description, attendee):
-    events_ws = get_events_sheet()
 
-    new_id = _get_new_event_id(events_ws)
+def _ics_split(value):
+    """쉼표로 구분된 TEXT 값 목록. \\,처럼 이스케이프된 쉼표에서는 나누지 않습니다."""
+    return [_ics_text(v) for v in re.findall(r"(?:\\.|[^,\\])+", value)]
 
-    row = [
-        new_id,
-        title,
-        start,
-        end,
-        int(all_day),
-        color,
-        description or "",
-        attendee,
-    ]
 
-    events_ws.append_row(row, value_input_option="USER_ENTERED")
+def _ics_lines(lines):
+    """접힌 줄(공백/탭으로 시작)을 앞 줄에 이어 붙이며 한 줄씩 내보냅니다."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
 
 
-def update_event(event_id, title, start, end, all_day, color, description, attendee):
-    events_ws = get_events_sheet()
+def _ics_time(params, value):
+    """DTSTART/DTEND/EXDATE 값 하나. TZID가 있으면 그 시간대에서 한국시간으로 바꿉니다.
 
-    try:
-        cell = events_ws.find(str(event_id))
-    except:
+    알 수 없는 TZID(Outlook의 "Korea Standard Time" 같은 Windows 이름)는 시각을 짐작하지 않고 ValueError.
+    """
+    parsed, date_only = _import_datetime(value)
+    zone = params.get("TZID", "").strip('"')
+    if parsed is not None and zone and not date_only and not value.endswith("Z"):
+        zone_info = tz.gettz(zone)
+        if zone_info is None:
+            raise ValueError(f"알 수 없는 시간대입니다: {zone}")
+        parsed = parsed.replace(tzinfo=zone_info).astimezone(tz.gettz("Asia/Seoul")).replace(tzinfo=None)
+    return parsed, date_only or params.get("VALUE") == "DATE"
+
+
+def iter_ics_events(lines):
+    """.ics 파일을 한 줄씩 읽으며 VEVENT마다 가져오기 행(dict)을 내보냅니다."""
+    row = None
+    for line in _ics_lines(lines):
+        name, _, value = line.partition(":")
+        name, *param_items = name.split(";")
+        name = name.upper()
+        params = dict(item.split("=", 1) for item in param_items if "=" in item)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            row = {"exdates": []}
+        elif row is None:
+            continue
+        elif name == "END" and value.upper() == "VEVENT":
+            yield row
+            row = None
+        elif name == "SUMMARY":
+            row["title"] = _ics_text(value)
+        elif name == "DESCRIPTION":
+            row["description"] = _ics_text(value)
+        elif name in ("DTSTART", "DTEND", "EXDATE"):
+            # 시각을 읽지 못한 일정은 그 일정만 오류로 남기고 파일은 계속 읽습니다.
+            try:
+                if name == "EXDATE":
+                    row["exdates"] += [_ics_time(params, v)[0] for v in value.split(",")]
+                else:
+                    row[name.lower()[2:]] = _ics_time(params, value)
+            except ValueError as e:
+                row.setdefault("error", str(e))
+        elif name == "RRULE":
+            row["rrule"] = value
+        elif name == "CATEGORIES":
+            row["categories"] = [v.strip() for v in _ics_split(value)]
+        elif name == "RECURRENCE-ID":
+            row["recurrence_id"] = value
+
+
+def iter_csv_events(lines):
+    """CSV 파일을 한 줄씩 읽으며 가져오기 행(dict)을 내보냅니다."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
         return
+    columns = [IMPORT_COLUMN_ALIASES.get(h.strip(), h.strip().lower()) for h in header]
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        yield {col: v.strip() for col, v in zip(columns, values) if col in EVENT_COLUMNS}
 
-    row_idx = cell.row
-
-    row = [
-        event_id,
-        title,
-        start,
-        end,
-        int(all_day),
-        color,
-        description or "",
-        attendee,
-    ]
 
-    events_ws.update(f"A{row_idx}:H{row_idx}", [row])
+def _import_attendee(value, default):
+    """참석자 값(이모지가 붙어 있어도 됨)을 ATTENDEE_LIST의 이름으로. 비어 있으면 default."""
+    value = str(value or "").strip()
+    if " " in value and value.split(" ", 1)[1] in ATTENDEE_COLORS:
+        value = value.split(" ", 1)[1]
+    if not value:
+        return default
+    if value not in ATTENDEE_COLORS:
+        raise ValueError(f"알 수 없는 참석자입니다: {value}")
+    return value
+
+
+def normalize_import_row(row, default_attendee):
+    """가져오기 행 하나를 검사해 EVENT_COLUMNS 레코드(ID 제외)로 바꿉니다. 잘못된 행이면 ValueError."""
+    if row.get("error"):
+        raise ValueError(row["error"])
+    if row.get("recurrence_id"):
+        raise ValueError("반복 일정의 회차별 수정은 가져오지 않습니다.")
+    title = str(row.get("title") or "").strip()
+    if not title:
+        raise ValueError("약속명이 없습니다.")
+    # ICS는 (시각, 날짜만 있었는지)로, CSV는 문자열로 들어옵니다.
+    start, date_only = row["start"] if isinstance(row.get("start"), tuple) else _import_datetime(row.get("start"))
+    end, _ = row["end"] if isinstance(row.get("end"), tuple) else _import_datetime(row.get("end"))
+    if start is None:
+        raise ValueError("시작 시각이 없습니다.")
+    all_day = date_only
+    # all_day 열은 _flag_values와 같이 0/1, TRUE/FALSE로 읽습니다. 비어 있으면 날짜만 있었는지로 정합니다.
+    flag = str(row.get("all_day") or "").strip().upper()
+    if flag in ("TRUE", "FALSE"):
+        all_day = flag == "TRUE"
+    elif flag:
+        try:
+            all_day = float(flag) != 0
+        except ValueError:
+            raise ValueError(f"종일 여부를 읽을 수 없습니다: {row['all_day']} (0/1 또는 TRUE/FALSE)") from None
+    if end is None:
+        end = start + (timedelta(days=1) if all_day else timedelta(hours=1))
+    if end <= start:
+        raise ValueError("종료 시각이 시작 시각보다 빠릅니다.")
+    categories = row.get("categories") or []
+    attendee = next((c for c in categories if c in ATTENDEE_COLORS), None)
+    attendee = attendee or _import_attendee(row.get("attendee"), default_attendee)
+    rrule = str(row.get("rrule") or "").strip()
+    if rrule:
+        # UTC로 적힌 UNTIL은 저장하는 시각과 맞춰 한국시간으로 바꿉니다.
+        rrule = re.sub(
+            r"UNTIL=(\d{8}T\d{6}Z)",
+            lambda m: f"UNTIL={_import_datetime(m.group(1))[0]:%Y%m%dT%H%M%S}",
+            rrule,
+        )
+        try:
+            rrulestr(rrule, dtstart=start)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"반복 규칙을 읽을 수 없습니다: {rrule}") from e
+    exdates = row.get("exdates") or []
+    if isinstance(exdates, str):
+        # CSV는 쉼표로 이은 문자열로 들어옵니다. 읽지 못하는 값은 _import_datetime이 ValueError로 알립니다.
+        exdates = [_import_datetime(value.strip())[0] for value in exdates.split(",") if value.strip()]
+    exdates = ",".join(occurrence_key(value) for value in exdates if value is not None)
+    return {
+        "title": title,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "all_day": all_day,
+        "color": ATTENDEE_COLORS[attendee],
+        "description": row.get("description") or "",
+        "attendee": attendee,
+        "rrule": rrule,
+        "exdates": exdates,
+    }
+
 
+def import_events(uploaded_file, default_attendee, snapshot):
+    """.ics/.csv 파일의 일정을 한꺼번에 추가합니다. (추가한 수, 건너뛴 중복 수, 오류 메시지 목록)
 
-def delete_event(event_id):
-    events_ws = get_events_sheet()
-    try:
-        cell = events_ws.find(str(event_id))
-        events_ws.delete_row(cell.row)
-    except:
-        return
+    파일은 한 줄씩 읽고, ID는 한 번에 이어서 발급하고, 시트에는 나눠 붙이는 append_rows로 보냅니다.
+    이미 있는 일정(약속명, 시작, 참석자가 같음)은 다시 가져와도 건너뜁니다. 펼친 회차가 아니라 저장된 행과
+    비교하고, 파일의 일정이 걸친 해의 보관 시트도 불러와 같이 봅니다.
+    """
+    lines = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    rows = iter_ics_events(lines) if uploaded_file.name.lower().endswith(".ics") else iter_csv_events(lines)
+    fields, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            fields.append(normalize_import_row(row, default_attendee))
+        except (ValueError, KeyError) as e:
+            errors.append(f"{number}번째 일정: {e}")
+    if not fields:
+        return 0, 0, errors
+
+    starts = [pd.Timestamp(f["start"]) for f in fields]
+    load_event_archives(min(starts), max(starts))
+    existing = snapshot.queue.overlay(normalize_events(get_synced_replica().read_events()))
+    existing = existing[existing["start"].between(min(starts), max(starts))]
+    seen = set() if existing.empty else set(zip(
+        existing["title"].astype(str),
+        existing["start"].dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        existing["attendee"].astype(str),
+    ))
+    new_fields = []
+    for f, start in zip(fields, starts):
+        key = (f["title"], start.strftime("%Y-%m-%dT%H:%M:%S"), f["attendee"])
+        if key not in seen:
+            seen.add(key)
+            new_fields.append(f)
+    if new_fields:
+        ids = get_id_allocator().next_ids(get_synced_replica(), len(new_fields))
+        records = [_event_record(event_id, **f) for event_id, f in zip(ids, new_fields)]
+        enqueue_mutations("insert", records)
+    return len(new_fields), len(fields) - len(new_fields), errors
 
 
 # -------------------------
@@ -259,32 +2984,41 @@ def delete_event(event_id):
 def fetch_memo():
     """가장 최신 메모 1개를 불러옵니다."""
     try:
-        memo_ws = get_memo_sheet()
-        rows = memo_ws.get_all_records()
-        
-        if not rows:
-            return None
-        
-        # timestamp 기준으로 정렬하여 가장 최신 메모 반환
-        sorted_rows = sorted(rows, key=lambda x: x.get('timestamp', ''), reverse=True)
-        return sorted_rows[0].get('content', '') if sorted_rows else None
+        return get_synced_replica().latest_memo()
     except Exception as e:
         st.error(f"메모를 불러오는 중 오류가 발생했습니다: {str(e)}")
         return None
 
 
 def save_memo(content):
-    """메모를 저장합니다. 기존 메모는 유지하고 새 메모를 추가합니다."""
-    try:
-        memo_ws = get_memo_sheet()
-        
-        # timestamp와 content 함께 저장
-        timestamp = datetime.now(tz=tz.gettz("Asia/Seoul")).isoformat()
-        memo_ws.append_row([timestamp, content], value_input_option="USER_ENTERED")
-        return True
-    except Exception as e:
-        st.error(f"메모를 저장하는 중 오류가 발생했습니다: {str(e)}")
-        return False
+    """메모를 저장합니다. 기존 메모는 유지하고 새 메모를 추가합니다.
+
+    일정과 같이 기록에 먼저 남긴 뒤 시트에 올리므로, 올리는 도중 앱이 멈춰도 메모를 잃지 않습니다.
+    시트에 연결할 수 없으면 기록에 남겨 두었다가 연결되면 올립니다.
+    """
+    # timestamp와 content 함께 저장
+    timestamp = datetime.now(tz=tz.gettz("Asia/Seoul")).isoformat()
+    replica = get_local_replica()
+    log = get_write_log()
+    # after: 이 메모가 붙을 memo 시트 위치. 다시 보낼 때 이미 올라갔는지 여기부터 확인합니다.
+    memo = {"timestamp": timestamp, "content": content, "after": replica.memo_row_count()}
+    # 먼저 남은 메모가 있으면 순서가 바뀌지 않도록 기록에만 남기고, 저장 스레드가 차례로 올립니다.
+    with log.memo_lock:
+        earlier = log.entries(memo=True)
+        seq = log.append("memo", None, memo)
+        if not earlier:
+            try:
+                get_backend().append_memo(timestamp, content)
+            except Exception as e:
+                if not _is_transient_error(e):
+                    log.discard_seq(seq)
+                    st.error(f"메모를 저장하는 중 오류가 발생했습니다: {str(e)}")
+                    return False
+                st.toast("지금은 시트에 연결할 수 없어 이 기기에 먼저 저장했어요. 연결되면 자동으로 올립니다.")
+            else:
+                log.discard_seq(seq)
+    replica.add_memo(timestamp, content)
+    return True
 
 
 # -------------------------
@@ -293,6 +3027,21 @@ def save_memo(content):
 
 st.set_page_config(page_title="밍콩콩 달력", layout="wide")
 
+# 이번 재실행의 Sheets 호출과 단계별 시간 기록 시작
+api_stats = get_api_stats()
+api_stats.begin_rerun()
+
+# 첫 화면에 필요한 데이터를 먼저 불러옵니다.
+with api_stats.stage("prefetch"):
+    prefetch_data()
+    # 이번 재실행의 달력과 수정 창은 이 스냅샷 하나를 같이 씁니다.
+    events_snapshot = fetch_rerun_snapshot()
+
+# 백그라운드 저장이 실패해서 되돌린 내 작업 알림
+write_queue = get_mutation_queue()
+for failure_message in write_queue.pop_failures(_session_id()):
+    st.error(f"❌ {failure_message}")
+
 
 # st.title("🥰 밍콩콩 일정관리")  # 타이틀 제거
 
@@ -326,6 +3075,114 @@ ATTENDEE_CLASSNAMES = {
     "밍콩콩": "attendee-mingkongkong",
 }
 
+# 달력에 그리는 순서 (밍콩콩 → 콩 → 밍깅)
+ATTENDEE_PRIORITY = {
+    "밍콩콩": 1,
+    "콩": 2,
+    "밍깅": 3,
+}
+
+
+# 일정이 겹치는지 볼 참석자. 밍콩콩(둘이 함께)은 콩, 밍깅 각자의 일정과도 겹칩니다.
+ATTENDEE_OVERLAPS = {
+    "밍콩콩": {"밍콩콩", "콩", "밍깅"},
+    "콩": {"콩", "밍콩콩"},
+    "밍깅": {"밍깅", "밍콩콩"},
+}
+
+
+def _map_attendee(attendee, mapping):
+    # 카테고리 열은 카테고리 단위로 매핑한 뒤 일반 값으로 풉니다.
+    return attendee.map(mapping).astype(object)
+
+
+def build_calendar_events(df):
+    """일정 DataFrame을 FullCalendar 이벤트 목록으로 바꿉니다. 행 단위 반복 없이 열 단위로 계산합니다."""
+    if df.empty:
+        return []
+    attendee = df["attendee"]
+    title = df["title"]
+    emoji = _map_attendee(attendee, ATTENDEE_EMOJIS)
+    color = df["color"].astype(object)
+    fallback_color = color.where(color.notna() & (color != ""), "#CCEDFF")
+    class_name = _map_attendee(attendee, ATTENDEE_CLASSNAMES)
+
+    payload = pd.DataFrame({
+        "id": df["id"].astype(str),
+        # 제목 앞에 참석자 이모티콘 추가 (콩 🫛, 밍깅 👸, 밍콩콩 ❤️)
+        "title": (emoji + " " + title).where(emoji.notna(), title),
+        "start": df["start"].dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "end": df["end"].dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "allDay": df["all_day"],
+        "color": _map_attendee(attendee, ATTENDEE_COLORS).fillna(fallback_color),
+        "textColor": _map_attendee(attendee, ATTENDEE_TEXT_COLORS).fillna("#ffffff"),
+        "classNames": [[c] if isinstance(c, str) else [] for c in class_name],
+        "extendedProps": [
+            {"description": d, "attendee": a, "rrule": r}
+            for d, a, r in zip(df["description"], attendee.astype(object), df["rrule"])
+        ],
+    })
+    # 우선순위 코드로 안정 정렬 (같은 참석자끼리는 기존 순서 유지)
+    priority = _map_attendee(attendee, ATTENDEE_PRIORITY).fillna(99).to_numpy()
+    payload = payload.iloc[np.argsort(priority, kind="stable")]
+    return payload.to_dict("records")
+
+
+# 창별 참석자 파티션을 몇 개까지 기억할지 (보통 앞뒤 달 이동 정도)
+CALENDAR_PARTITION_CACHE_SIZE = 16
+
+
+class CalendarPartitions:
+    """보이는 창의 일정을 참석자별로 나눠 FullCalendar 이벤트 목록까지 만들어 둔 것."""
+
+    def __init__(self, df):
+        self.payloads = {
+            attendee: build_calendar_events(part)
+            for attendee, part in df.groupby("attendee", observed=True, sort=False)
+        }
+
+    def events(self, selected):
+        """선택한 참석자의 목록만 우선순위 순서로 이어 붙입니다. (build_calendar_events 정렬과 같은 순서)"""
+        ordered = sorted(selected, key=lambda a: ATTENDEE_PRIORITY.get(a, 99))
+        return [event for attendee in ordered for event in self.payloads.get(attendee, [])]
+
+
+class CalendarPartitionCache:
+    """(데이터 버전, 창) → CalendarPartitions. 필터만 바꾼 재실행은 다시 나누거나 변환하지 않습니다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+    def get(self, snapshot, window_start, window_end):
+        # 아직 시트에 반영되지 않은 내 쓰기가 있으면 버전만으로 구분할 수 없으니 캐시하지 않습니다.
+        if snapshot.queue.has_pending() or snapshot.df is None:
+            return CalendarPartitions(snapshot.in_range(window_start, window_end))
+        key = (snapshot.version, window_start, window_end)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        partitions = CalendarPartitions(snapshot.in_range(window_start, window_end))
+        with self.lock:
+            self.entries[key] = partitions
+            while len(self.entries) > CALENDAR_PARTITION_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return partitions
+
+
+@st.cache_resource
+def get_calendar_partition_cache():
+    return CalendarPartitionCache()
+
+# 반복 선택지 → RRULE (종료일은 폼에서 UNTIL로 붙임)
+RECURRENCE_OPTIONS = {
+    "반복 안 함": "",
+    "매주": "FREQ=WEEKLY",
+    "2주마다": "FREQ=WEEKLY;INTERVAL=2",
+    "매월": "FREQ=MONTHLY",
+}
+
 # -------------------------
 # 필터 기본값
 # -------------------------
@@ -371,6 +3228,24 @@ def parse_time_string(value: str):
             continue
     return None
 
+def confirm_conflicts(state_key, conflicts, signature):
+    """겹치는 일정이 있으면 경고만 보여주고, 같은 내용으로 한 번 더 저장을 누르면 True."""
+    if conflicts.empty:
+        st.session_state[state_key] = None
+        return True
+    if st.session_state.get(state_key) == signature:
+        st.session_state[state_key] = None
+        return True
+    st.session_state[state_key] = signature
+    lines = [
+        f"- {row.start:%m/%d %H:%M}~{row.end:%H:%M} {ATTENDEE_EMOJIS.get(row.attendee, '')} {row.title}"
+        for row in conflicts.head(5).itertuples(index=False)
+    ]
+    if len(conflicts) > 5:
+        lines.append(f"- 외 {len(conflicts) - 5}건")
+    st.warning("⚠️ 겹치는 일정이 있어요. 그래도 저장하려면 한 번 더 눌러주세요.\n" + "\n".join(lines))
+    return False
+
 def parse_calendar_date(value: str):
     if not value:
         return None
@@ -413,6 +3288,12 @@ with st.sidebar.form("event_form", clear_on_submit=False):
 
     description = st.text_area("메모")
 
+    col1, col2 = st.columns(2)
+    with col1:
+        recurrence = st.selectbox("반복", list(RECURRENCE_OPTIONS))
+    with col2:
+        repeat_until = st.date_input("반복 종료일", value=start_date + relativedelta(months=3))
+
     submitted = st.form_submit_button("➕ 약속 추가")
 
     if submitted:
@@ -430,18 +3311,66 @@ with st.sidebar.form("event_form", clear_on_submit=False):
 
                 if end_dt <= start_dt:
                     st.warning("종료 시간은 약속 시작 이후여야 합니다.")
+                elif RECURRENCE_OPTIONS[recurrence] and repeat_until < start_date:
+                    st.warning("반복 종료일은 약속일 이후여야 합니다.")
                 else:
-                    insert_event(
-                        title,
-                        start_dt.isoformat(),
-                        end_dt.isoformat(),
-                        False,
-                        color,
-                        description,
-                        attendee,
-                    )
-                    st.success("약속이 추가되었습니다!")
-                    st.rerun()
+                    rrule = RECURRENCE_OPTIONS[recurrence]
+                    if rrule:
+                        # 반복 일정은 행 하나로 저장하고, 달력에 그릴 때 회차를 펼칩니다.
+                        rrule += f";UNTIL={repeat_until:%Y%m%d}T235959"
+                    slots = occurrence_slots(rrule, start_dt, end_dt) if rrule else [(start_dt, end_dt)]
+                    # 같은 참석자(밍콩콩이면 콩, 밍깅 포함)의 겹치는 일정을 먼저 보여줍니다.
+                    conflicts = events_snapshot.conflicts(slots, ATTENDEE_OVERLAPS.get(attendee, {attendee}))
+                    signature = (title, start_dt, end_dt, attendee, rrule)
+                    if confirm_conflicts("new_event_conflict_ack", conflicts, signature):
+                        insert_event(
+                            title,
+                            start_dt.isoformat(),
+                            end_dt.isoformat(),
+                            False,
+                            color,
+                            description,
+                            attendee,
+                            rrule=rrule,
+                        )
+                        st.success("약속이 추가되었습니다!")
+                        st.rerun()
+
+
+# 여러 일정을 파일로 한꺼번에 추가 (.ics: 다른 캘린더에서 내보낸 파일, .csv: EVENT_COLUMNS 또는 한글 머리글)
+with st.sidebar.expander("📥 일정 가져오기 (ICS / CSV)"):
+    import_file = st.file_uploader("파일", type=["ics", "csv"], key="import_file")
+    import_attendee_display = st.selectbox(
+        "참석자가 없는 일정",
+        [f"{ATTENDEE_EMOJIS.get(a, '')} {a}" for a in ATTENDEE_LIST],
+        key="import_attendee",
+    )
+    if st.button("📥 가져오기", disabled=import_file is None, key="import_submit"):
+        added, skipped, import_errors = import_events(
+            import_file, import_attendee_display.split(" ", 1)[1], events_snapshot
+        )
+        for message in import_errors[:IMPORT_ERROR_LIMIT]:
+            st.warning(message)
+        if len(import_errors) > IMPORT_ERROR_LIMIT:
+            st.warning(f"외 {len(import_errors) - IMPORT_ERROR_LIMIT}건의 오류")
+        note = f" (이미 있는 일정 {skipped}건은 건너뜀)" if skipped else ""
+        st.success(f"일정 {added}건을 추가했습니다.{note}")
+
+
+
+@st.fragment(run_every=2)
+def write_status():
+    """이 세션의 저장 대기 작업을 지켜보다가, 모두 끝나면 전체 화면을 다시 그립니다. (실패 알림 포함)"""
+    waiting = write_queue.in_flight(_session_id())
+    if not waiting:
+        st.rerun()
+    note = " (연결 오류로 다시 시도하는 중)" if write_queue.retrying else ""
+    st.caption(f"⏳ 저장 중 {waiting}건{note}")
+
+
+if write_queue.in_flight(_session_id()):
+    with st.sidebar:
+        write_status()
 
 
 # -------------------------
@@ -490,7 +3419,8 @@ st.markdown("---")
 st.markdown("### 📝 오늘의 메모")
 
 # 저장된 메모 불러오기
-saved_memo = fetch_memo()
+with api_stats.stage("memo"):
+    saved_memo = fetch_memo()
 
 # 메모 입력
 memo_text = st.text_area(
@@ -512,6 +3442,28 @@ with col1:
         else:
             st.warning("메모 내용을 입력해주세요.")
 
+# 지난 메모 (켰을 때만 불러옴)
+if st.toggle("📚 지난 메모 보기"):
+    archive_titles = list_memo_archives()
+    history_source = st.selectbox(
+        "기간",
+        ["최근"] + archive_titles,
+        format_func=lambda t: t if t == "최근" else f"{t}년",
+    )
+    history_page = st.number_input("페이지", min_value=1, value=1, step=1) - 1
+    if history_source == "최근":
+        history_rows = get_local_replica().recent_memos(
+            history_page * MEMO_HISTORY_PAGE_SIZE, MEMO_HISTORY_PAGE_SIZE
+        )
+    else:
+        history_rows = fetch_memo_archive_page(history_source, history_page)
+    if not history_rows:
+        st.caption("이 페이지에는 메모가 없습니다.")
+    for row in history_rows:
+        ts, content = (list(row) + ["", ""])[:2]
+        st.caption(str(ts)[:16].replace("T", " "))
+        st.text(content)
+
 st.markdown("---")
 
 # 필터 UI
@@ -526,56 +3478,46 @@ selected_display = st.multiselect(
 selected = [s.split(" ", 1)[1] if " " in s else s for s in selected_display]
 st.session_state.selected_attendees = selected
 
-# Fetch events
-events_df = fetch_events()
-events_df = events_df[events_df["attendee"].isin(selected)]
-
-# FullCalendar용 변환
-events = []
-for _, r in events_df.iterrows():
-    attendee = r["attendee"]
-    emoji = ATTENDEE_EMOJIS.get(attendee, "")
-    
-    # 제목에 이모티콘 추가
-    if attendee == "콩":
-        # 콩: 제목 앞에 🫛
-        display_title = f"🫛 {r['title']}"
-    elif attendee == "밍깅":
-        # 밍깅: 제목 앞에 👸
-        display_title = f"👸 {r['title']}"
-    elif attendee == "밍콩콩":
-        # 밍콩콩: 제목 앞에 ❤️
-        display_title = f"❤️ {r['title']}"
-    else:
-        display_title = r["title"]
-    
-    event_color = ATTENDEE_COLORS.get(attendee, r.get("color") or "#CCEDFF")
-    event_class = ATTENDEE_CLASSNAMES.get(attendee, "")
-    events.append({
-        "id": str(r["id"]),
-        "title": display_title,
-        "start": r["start"],
-        "end": r["end"],
-        "allDay": bool(r["all_day"]),
-        "color": event_color,
-        "textColor": ATTENDEE_TEXT_COLORS.get(attendee, "#ffffff"),
-        "classNames": [event_class] if event_class else [],
-        "extendedProps": {
-            "description": r["description"],
-            "attendee": attendee,
-        }
-    })
 # -------------------------
-# 이벤트 우선순위 정렬 (밍콩콩 → 콩 → 밍깅)
+# 달력 표시 구간 (보이는 달 + 앞뒤 여유분만 불러옴)
 # -------------------------
 
-priority = {
-    "밍콩콩": 1,
-    "콩": 2,
-    "밍깅": 3
-}
+CALENDAR_PREFETCH_MONTHS = 1
+
+if "calendar_anchor" not in st.session_state:
+    st.session_state.calendar_anchor = today_korea.replace(day=1)
+
+nav_prev, nav_today, nav_next, _ = st.columns([1, 1, 1, 9])
+if nav_prev.button("◀", key="calendar_prev"):
+    st.session_state.calendar_anchor -= relativedelta(months=1)
+if nav_today.button("오늘", key="calendar_today"):
+    st.session_state.calendar_anchor = today_korea.replace(day=1)
+if nav_next.button("▶", key="calendar_next"):
+    st.session_state.calendar_anchor += relativedelta(months=1)
+
+calendar_anchor = st.session_state.calendar_anchor
+# 월간 달력은 앞뒤 주까지 보여주므로 그만큼 더 넓게 잡습니다.
+window_start = (
+    datetime.combine(calendar_anchor, datetime.min.time())
+    - relativedelta(months=CALENDAR_PREFETCH_MONTHS)
+    - timedelta(days=7)
+)
+window_end = (
+    datetime.combine(calendar_anchor, datetime.min.time())
+    + relativedelta(months=1 + CALENDAR_PREFETCH_MONTHS)
+    + timedelta(days=14)
+)
+
+# Fetch events (참석자별로 나눠 변환까지 해 둔 것을 데이터 버전/창 단위로 재사용)
+with api_stats.stage("events"):
+    # 창이 보관된 해에 걸치면 그 해 시트만 불러오고, 이번 재실행의 스냅샷도 다시 받습니다.
+    if load_event_archives(window_start, window_end):
+        events_snapshot = fetch_rerun_snapshot()
+    calendar_partitions = get_calendar_partition_cache().get(events_snapshot, window_start, window_end)
 
-events.sort(key=lambda e: priority.get(e["extendedProps"]["attendee"], 99))
+# FullCalendar용 변환 (선택한 참석자 목록만 이어 붙임)
+with api_stats.stage("payload"):
+    events = calendar_partitions.events(selected)
 
 
 calendar_options = {
@@ -588,9 +3530,17 @@ calendar_options = {
     "eventDisplay": "block",
     # 달력 월간 뷰에서 시간 표시 숨김
     "displayEventTime": False,
+    # 달 이동은 위의 버튼으로 합니다. (불러온 구간과 보이는 달을 맞추기 위함)
+    "initialDate": calendar_anchor.isoformat(),
+    "headerToolbar": {"left": "", "center": "title", "right": ""},
 }
 
-state = calendar(events=events, options=calendar_options)
+with api_stats.stage("calendar"):
+    state = calendar(
+        events=events,
+        options=calendar_options,
+        callbacks=["dateClick", "eventClick", "eventChange", "eventsSet", "select"],
+    )
 
 if state.get("dateClick"):
     click_payload = state["dateClick"]
@@ -639,14 +3589,39 @@ if state.get("eventClick"):
     st.write(f"**참석자:** {props.get('attendee','')}")
     st.write(f"**메모:** {props.get('description','')}")
 
+    # 반복 일정이면 누른 회차(시작 시각)를 기억해 둡니다.
+    occurrence = None
+    if props.get("rrule"):
+        occurrence = occurrence_key(_parse_event_times(pd.Series([clicked["start"]])).iloc[0])
+        st.write("**반복:** 반복 일정의 한 회차입니다.")
+
     # 수정
-    if st.button("✏ 수정하기"):
+    if st.button("✏ 수정하기" if not occurrence else "✏ 반복 전체 수정"):
+        st.session_state.inline_edit_event_id = event_id
+        st.session_state.inline_edit_occurrence = None
+        st.session_state.inline_edit_base_revision = None
+        st.rerun()
+    if occurrence and st.button("✏ 이 날짜만 수정"):
         st.session_state.inline_edit_event_id = event_id
+        st.session_state.inline_edit_occurrence = occurrence
+        st.session_state.inline_edit_base_revision = None
         st.rerun()
 
     # 삭제
-    if st.button("🗑 삭제"):
-        delete_event(event_id)
+    if occurrence and st.button("🗑 이 날짜만 삭제"):
+        series_row = events_snapshot.get(event_id)
+        if series_row is not None:
+            skip_occurrence(series_row, occurrence)
+        st.success("이 날짜의 일정만 삭제되었습니다.")
+        st.rerun()
+    if st.button("🗑 삭제" if not occurrence else "🗑 반복 전체 삭제"):
+        # 반복 전체 삭제면 회차별로 고쳐 둔 일정도 같이 지웁니다.
+        targets = [event_id] + (events_snapshot.overrides_of(event_id) if occurrence else [])
+        # 화면에 보이던 리비전 그대로일 때만 지웁니다. (그 사이 다른 곳에서 고쳤으면 알려줌)
+        for target_id in targets:
+            target_row = events_snapshot.get(target_id)
+            if target_row is not None:
+                delete_event(target_id, int(target_row["revision"]))
         st.success("삭제되었습니다.")
         st.rerun()
 
@@ -654,18 +3629,37 @@ if state.get("eventClick"):
 # 인라인 수정 창
 # -------------------------
 
+inline_edit_row = None
 if st.session_state.get("inline_edit_event_id"):
+    # 달력에 쓴 스냅샷에서 ID로 바로 찾습니다. (시트를 다시 읽지 않음)
+    inline_edit_row = events_snapshot.get(st.session_state.inline_edit_event_id)
+    if inline_edit_row is None:
+        st.warning("수정할 일정을 찾을 수 없습니다. 이미 삭제되었을 수 있어요.")
+        st.session_state.inline_edit_event_id = None
+        st.session_state.inline_edit_occurrence = None
+        st.session_state.inline_edit_base_revision = None
+
+if inline_edit_row is not None:
     event_id = st.session_state.inline_edit_event_id
-    df = fetch_events()
-    row = df[df["id"] == event_id].iloc[0]
+    row = inline_edit_row
+    # 수정 창을 처음 열 때의 리비전. 그 뒤 다른 곳에서 먼저 고쳤으면 저장할 때 충돌로 알려줍니다.
+    if st.session_state.get("inline_edit_base_revision") is None:
+        st.session_state.inline_edit_base_revision = int(row["revision"])
+    # 반복 일정의 한 회차만 고칠 때는 그 회차 시각으로 채우고, 저장하면 별도 일정으로 만듭니다.
+    occurrence = st.session_state.get("inline_edit_occurrence")
+    if occurrence:
+        row = row.copy()
+        row["end"] = pd.Timestamp(occurrence) + (row["end"] - row["start"])
+        row["start"] = pd.Timestamp(occurrence)
 
     st.markdown("---")
-    st.markdown("### ✏ 인라인 수정")
+    st.markdown("### ✏ 인라인 수정" if not occurrence else f"### ✏ 인라인 수정 ({occurrence[:10]} 회차만)")
 
     with st.form("edit_form"):
         title = st.text_input("약속명", value=row["title"])
-        sdt = datetime.fromisoformat(row["start"])
-        edt = datetime.fromisoformat(row["end"])
+        # 불러올 때 이미 파싱된 시각(Timestamp)
+        sdt = row["start"]
+        edt = row["end"]
 
         col1, col2 = st.columns(2)
         with col1:
@@ -710,17 +3704,79 @@ if st.session_state.get("inline_edit_event_id"):
                 start_dt = datetime.combine(start_date, start_time)
                 end_dt = datetime.combine(end_date, end_time)
 
-                update_event(
-                    event_id,
-                    title,
-                    start_dt.isoformat(),
-                    end_dt.isoformat(),
-                    False,
-                    color,
-                    description,
-                    attendee,
+                # 반복 전체를 고치면 바뀐 시각 기준의 모든 회차를 검사합니다. (자기 자신은 제외)
+                if not occurrence and row["rrule"]:
+                    slots = occurrence_slots(row["rrule"], start_dt, end_dt)
+                else:
+                    slots = [(start_dt, end_dt)]
+                conflicts = events_snapshot.conflicts(
+                    slots, ATTENDEE_OVERLAPS.get(attendee, {attendee}), exclude_id=event_id
                 )
+                signature = (event_id, occurrence, title, start_dt, end_dt, attendee)
+                if confirm_conflicts("edit_event_conflict_ack", conflicts, signature):
+                    if occurrence:
+                        insert_event(
+                            title,
+                            start_dt.isoformat(),
+                            end_dt.isoformat(),
+                            False,
+                            color,
+                            description,
+                            attendee,
+                            recurrence_id=f"{event_id}@{occurrence}",
+                        )
+                    else:
+                        exdates = row["exdates"]
+                        # 반복 일정의 시작을 옮기면 빠진 회차와 따로 고친 회차도 같이 옮겨야 계속 맞습니다.
+                        shift = pd.Timestamp(start_dt) - row["start"]
+                        if row["rrule"] and shift != pd.Timedelta(0):
+                            exdates = shift_occurrence_keys(exdates, shift)
+                            rekey_overrides(event_id, shift, events_snapshot)
+                        update_event(
+                            event_id,
+                            title,
+                            start_dt.isoformat(),
+                            end_dt.isoformat(),
+                            False,
+                            color,
+                            description,
+                            attendee,
+                            base_revision=st.session_state.inline_edit_base_revision,
+                            rrule=row["rrule"],
+                            exdates=exdates,
+                            recurrence_id=row["recurrence_id"],
+                        )
+
+                    st.success("수정 완료!")
+                    st.session_state.inline_edit_event_id = None
+                    st.session_state.inline_edit_occurrence = None
+                    st.session_state.inline_edit_base_revision = None
+                    st.rerun()
 
-                st.success("수정 완료!")
-                st.session_state.inline_edit_event_id = None
-                st.rerun()
+
+# -------------------------
+# 성능 계측 패널 (debug_panel 설정을 켠 뒤 ?debug=1)
+# -------------------------
+
+if DEBUG_PANEL and st.query_params.get("debug") == "1":
+    rerun_summary = api_stats.current()
+    quota = api_stats.quota_usage()
+    with st.sidebar.expander("🔧 성능 계측", expanded=True):
+        st.caption(
+            f"이번 재실행 {rerun_summary['seconds']:.3f}초 · "
+            f"Sheets 호출 {rerun_summary['api_calls']}회 ({rerun_summary['api_seconds']:.3f}초, "
+            f"{rerun_summary['api_bytes']:,} bytes)"
+        )
+        st.caption(
+            f"최근 1분 할당량: 읽기 {quota['read']}/{SHEETS_QUOTA_PER_MINUTE}, "
+            f"쓰기 {quota['write']}/{SHEETS_QUOTA_PER_MINUTE}"
+        )
+        if rerun_summary["stages"]:
+            st.dataframe(pd.Series(rerun_summary["stages"], name="초").to_frame())
+        with api_stats.lock:
+            totals = {method: dict(stat) for method, stat in api_stats.totals.items()}
+        if totals:
+            st.markdown("**프로세스 누계**")
+            st.dataframe(pd.DataFrame(totals).T)
+
+api_stats.finish_rerun()
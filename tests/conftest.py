@@ -0,0 +1,129 @@
+"""schedule.py를 Streamlit 서버 없이(bare 모드) 불러와 쓰는 테스트 공용 픽스처.
+
+저장소는 메모리(MemoryBackend)를 쓰고, 복제본과 쓰기 큐는 테스트마다 새로 만듭니다.
+"""
+import importlib.util
+import os
+import pathlib
+import types
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SECRETS = 'app_password = "test"\nstorage_backend = "memory"\nlocal_db_path = ":memory:"\n'
+
+
+@pytest.fixture(scope="session")
+def schedule(tmp_path_factory):
+    """schedule.py 모듈. secrets.toml이 있는 임시 폴더에서 한 번만 불러옵니다."""
+    home = tmp_path_factory.mktemp("app")
+    (home / ".streamlit").mkdir()
+    (home / ".streamlit" / "secrets.toml").write_text(SECRETS, encoding="utf-8")
+    cwd = os.getcwd()
+    os.chdir(home)
+    try:
+        spec = importlib.util.spec_from_file_location("schedule", ROOT / "schedule.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    return module
+
+
+@pytest.fixture
+def fake_backend(schedule):
+    """보관 시트까지 있는 메모리 저장소 클래스. fail(메서드, 오류)로 다음 호출에 오류를 냅니다.
+
+    수정/삭제는 rows의 보관 연도를 보고 events 또는 그 해 보관 시트에서 합니다. (SheetsBackend와 같음)
+    """
+
+    class FakeBackend(schedule.MemoryBackend):
+        archives_events = True
+
+        def __init__(self, events=(), memos=()):
+            super().__init__(events, memos)
+            self.event_archives = {}
+            self.catalog = []
+            self.errors = {}
+            self.calls = []
+
+        def fail(self, method, error):
+            self.errors.setdefault(method, []).append(error)
+
+        def _call(self, method):
+            self.calls.append(method)
+            if self.errors.get(method):
+                raise self.errors[method].pop(0)
+
+        def _sheet(self, event_id, rows):
+            """rows가 가리키는 시트(events 또는 보관 연도)의 레코드 목록."""
+            year = rows[event_id][0] if rows.get(event_id) else 0
+            return self.event_archives.setdefault(year, []) if year else self.events
+
+        def fetch_current(self, event_ids, rows):
+            return {
+                event_id: next((dict(e) for e in self._sheet(event_id, rows) if e["id"] == event_id), None)
+                for event_id in event_ids
+            }
+
+        def update_events(self, records, rows):
+            self._call("update_events")
+            for record in records:
+                sheet = self._sheet(record["id"], rows)
+                sheet[:] = [dict(record) if e["id"] == record["id"] else e for e in sheet]
+            self.version += 1
+
+        def delete_events(self, event_ids, rows):
+            self._call("delete_events")
+            for event_id in event_ids:
+                sheet = self._sheet(event_id, rows)
+                sheet[:] = [e for e in sheet if e["id"] != event_id]
+            self.version += 1
+
+        def insert_events(self, records):
+            self._call("insert_events")
+            super().insert_events(records)
+
+        def delete_memos(self, count):
+            self._call("delete_memos")
+            super().delete_memos(count)
+
+        def load_event_catalog(self):
+            return [dict(entry) for entry in self.catalog]
+
+        def save_event_catalog(self, entries):
+            self.catalog = [dict(entry) for entry in entries]
+
+        def load_event_archive(self, year):
+            return [dict(record) for record in self.event_archives.get(year, [])]
+
+        def append_event_archive(self, year, records):
+            self._call("append_event_archive")
+            self.event_archives.setdefault(year, []).extend(dict(record) for record in records)
+
+    return FakeBackend
+
+
+@pytest.fixture
+def store(schedule, tmp_path):
+    """테스트마다 새로 만든 복제본, 공유 스냅샷, 쓰기 큐(기록 포함)."""
+    path = str(tmp_path / "replica.db")
+    return types.SimpleNamespace(
+        replica=schedule.LocalReplica(path),
+        cache=schedule.EventsCache(),
+        queue=schedule.MutationQueue(schedule.WriteAheadLog(path)),
+    )
+
+
+@pytest.fixture
+def make_event(schedule):
+    """_event_record로 일정 레코드를 만듭니다. 참석자는 기본으로 ATTENDEE_LIST의 첫 사람."""
+
+    def make(event_id, title="약속", start="2026-11-16T09:00:00", end="2026-11-16T10:00:00", **fields):
+        attendee = fields.pop("attendee", schedule.ATTENDEE_LIST[0])
+        return schedule._event_record(
+            event_id, title, start, end, fields.pop("all_day", False), fields.pop("color", ""),
+            fields.pop("description", ""), attendee, **fields,
+        )
+
+    return make
@@ -0,0 +1,107 @@
+"""오래된 일정을 events_YYYY 보관 시트로 옮기는 archive_old_events와, 보관된 일정을 고치거나 지우는 경로."""
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+
+NOW = datetime(2026, 10, 17, 9, 0, tzinfo=tz.gettz("Asia/Seoul"))
+SESSION = "session-1"
+
+
+@pytest.fixture
+def backend(schedule, store, fake_backend, make_event):
+    backend = fake_backend([
+        make_event(1, "재작년 약속", "2024-05-01T10:00:00", "2024-05-01T11:00:00"),
+        make_event(2, "작년 약속", "2025-03-01T10:00:00", "2025-03-01T11:00:00"),
+        make_event(3, "최근 약속", "2026-09-01T10:00:00", "2026-09-01T11:00:00"),
+        make_event(4, "옛 반복", "2023-01-02T10:00:00", "2023-01-02T11:00:00", rrule="FREQ=WEEKLY"),
+    ])
+    schedule.sync_replica(store.replica, store.cache, backend)
+    return backend
+
+
+def archive(schedule, store, backend):
+    return schedule.archive_old_events(store.replica, store.cache, backend, store.queue, now=NOW)
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+def counts(backend):
+    return {entry["year"]: entry["events"] for entry in backend.load_event_catalog()}
+
+
+def load_archives(schedule, store, backend):
+    """보관 연도를 복제본에 불러옵니다. (load_event_archives가 달력 창에 맞춰 하는 일)"""
+    for year in list(backend.event_archives):
+        store.replica.apply_events(
+            backend.load_event_archive(year), store.replica.write_generation, archive_year=year
+        )
+    store.cache.invalidate()
+
+
+def test_old_single_events_move_to_their_start_year(schedule, store, backend):
+    assert archive(schedule, store, backend) == 2
+
+    assert ids(backend.load_events()) == [3, 4]
+    assert {year: ids(records) for year, records in backend.event_archives.items()} == {2024: [1], 2025: [2]}
+    assert counts(backend) == {2024: 1, 2025: 1}
+    assert sorted(store.replica.read_events()["id"].tolist()) == [3, 4]
+
+
+def test_rerun_after_crash_does_not_archive_twice(schedule, store, backend):
+    # 보관 시트와 목록에는 다 썼지만 events 시트에서 지우기 전에 멈춘 경우
+    backend.fail("delete_events", ConnectionError("down"))
+    with pytest.raises(ConnectionError):
+        archive(schedule, store, backend)
+    assert ids(backend.load_events()) == [1, 2, 3, 4]
+
+    assert archive(schedule, store, backend) == 2
+    assert ids(backend.load_events()) == [3, 4]
+    assert {year: ids(records) for year, records in backend.event_archives.items()} == {2024: [1], 2025: [2]}
+    assert counts(backend) == {2024: 1, 2025: 1}
+
+
+def test_editing_an_archived_event_keeps_it_archived_while_still_old(schedule, store, backend, make_event):
+    archive(schedule, store, backend)
+    load_archives(schedule, store, backend)
+    store.queue.put(
+        "update", 1,
+        make_event(1, "고친 약속", "2024-05-02T10:00:00", "2024-05-02T11:00:00", revision=2),
+        owner=SESSION,
+    )
+    schedule.flush_mutations(store.queue, store.cache, store.replica, backend)
+
+    assert [(r["id"], r["title"]) for r in backend.event_archives[2024]] == [(1, "고친 약속")]
+    assert ids(backend.load_events()) == [3, 4]
+    assert counts(backend) == {2024: 1, 2025: 1}
+
+
+def test_editing_an_archived_event_to_a_recent_start_moves_it_back(schedule, store, backend, make_event):
+    archive(schedule, store, backend)
+    load_archives(schedule, store, backend)
+    store.queue.put(
+        "update", 1,
+        make_event(1, "다시 잡은 약속", "2026-10-20T10:00:00", "2026-10-20T11:00:00", revision=2),
+        owner=SESSION,
+    )
+    schedule.flush_mutations(store.queue, store.cache, store.replica, backend)
+
+    assert backend.event_archives[2024] == []
+    assert ids(backend.load_events()) == [3, 4, 1]
+    assert counts(backend) == {2024: 0, 2025: 1}
+    replica = store.replica.read_events().set_index("id")
+    assert replica.loc[1, "archive_year"] == 0
+    assert store.queue.pop_failures(SESSION) == []
+
+
+def test_deleting_an_archived_event_lowers_the_catalog_count(schedule, store, backend):
+    archive(schedule, store, backend)
+    load_archives(schedule, store, backend)
+    store.queue.put("delete", 2, {"id": 2, "revision": 1}, owner=SESSION)
+    schedule.flush_mutations(store.queue, store.cache, store.replica, backend)
+
+    assert backend.event_archives[2025] == []
+    assert counts(backend) == {2024: 1, 2025: 0}
+    assert store.queue.pop_failures(SESSION) == []
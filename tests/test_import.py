@@ -0,0 +1,110 @@
+"""일정 가져오기: ICS/CSV 파서와 normalize_import_row의 검사."""
+import pytest
+
+ICS = [
+    "BEGIN:VCALENDAR",
+    "BEGIN:VEVENT",
+    r"SUMMARY:회의\, 2차",
+    "DTSTART;TZID=America/New_York:20270105T100000",
+    "DTEND:20270106T010000Z",
+    r"DESCRIPTION:첫 줄\n둘째 줄이",
+    "  이어짐",
+    r"CATEGORIES:밍깅,일\,회의",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "SUMMARY:매주",
+    "DTSTART;VALUE=DATE:20270105",
+    "RRULE:FREQ=WEEKLY;UNTIL=20270301T145959Z",
+    "EXDATE;VALUE=DATE:20270112,20270119",
+    "END:VEVENT",
+    "BEGIN:VEVENT",
+    "SUMMARY:윈도우 시간대",
+    'DTSTART;TZID="Korea Standard Time":20270105T100000',
+    "END:VEVENT",
+    "END:VCALENDAR",
+]
+
+
+@pytest.fixture
+def ics_rows(schedule):
+    return list(schedule.iter_ics_events(line + "\r\n" for line in ICS))
+
+
+def normalize(schedule, **row):
+    return schedule.normalize_import_row(row, "콩")
+
+
+def test_ics_text_times_and_folded_lines(ics_rows):
+    meeting = ics_rows[0]
+    assert meeting["title"] == "회의, 2차"
+    assert meeting["description"] == "첫 줄\n둘째 줄이 이어짐"
+    assert meeting["categories"] == ["밍깅", "일,회의"]
+    # 뉴욕 10:00(EST)과 UTC 01:00은 한국시간으로 바꿔 둡니다.
+    assert meeting["start"][0].isoformat() == "2027-01-06T00:00:00"
+    assert meeting["end"][0].isoformat() == "2027-01-06T10:00:00"
+
+
+def test_ics_unknown_timezone_is_a_row_error(schedule, ics_rows):
+    assert "알 수 없는 시간대" in ics_rows[2]["error"]
+    with pytest.raises(ValueError, match="알 수 없는 시간대"):
+        schedule.normalize_import_row(ics_rows[2], "콩")
+
+
+def test_ics_event_normalizes_to_a_record(schedule, ics_rows):
+    record = schedule.normalize_import_row(ics_rows[0], "콩")
+    assert record["attendee"] == "밍깅"
+    assert record["color"] == schedule.ATTENDEE_COLORS["밍깅"]
+    assert (record["start"], record["end"], record["all_day"]) == (
+        "2027-01-06T00:00:00", "2027-01-06T10:00:00", False
+    )
+
+
+def test_ics_recurring_all_day_event(schedule, ics_rows):
+    record = schedule.normalize_import_row(ics_rows[1], "콩")
+    assert record["all_day"] is True
+    assert record["end"] == "2027-01-06T00:00:00"
+    # UTC로 적힌 UNTIL은 한국시간으로 바꿉니다.
+    assert record["rrule"] == "FREQ=WEEKLY;UNTIL=20270301T235959"
+    assert record["exdates"] == "2027-01-12T00:00:00,2027-01-19T00:00:00"
+
+
+def test_csv_rows_use_korean_headers(schedule):
+    lines = ["약속명,시작,종료,참석자,메모,종일,빠진 회차", '점심,2027-01-05 12:00,,🫛 콩,"메모, 하나",0,']
+    [row] = schedule.iter_csv_events(lines)
+    record = schedule.normalize_import_row(row, "밍콩콩")
+    assert (record["title"], record["attendee"], record["description"]) == ("점심", "콩", "메모, 하나")
+    assert (record["start"], record["end"]) == ("2027-01-05T12:00:00", "2027-01-05T13:00:00")
+
+
+@pytest.mark.parametrize("flag, expected", [("1", True), ("TRUE", True), ("true", True), ("0", False), ("FALSE", False)])
+def test_all_day_flags(schedule, flag, expected):
+    assert normalize(schedule, title="t", start="2027-01-05", all_day=flag)["all_day"] is expected
+
+
+@pytest.mark.parametrize("flag", ["yes", "y", "종일"])
+def test_unreadable_all_day_is_a_row_error(schedule, flag):
+    with pytest.raises(ValueError, match="종일 여부"):
+        normalize(schedule, title="t", start="2027-01-05T10:00", all_day=flag)
+
+
+def test_csv_exdates_are_parsed(schedule):
+    record = normalize(
+        schedule, title="t", start="2027-01-05T10:00", rrule="FREQ=DAILY",
+        exdates="2027-01-06T10:00:00, 20270107T100000",
+    )
+    assert record["exdates"] == "2027-01-06T10:00:00,2027-01-07T10:00:00"
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"start": "2027-01-05T10:00"}, "약속명이 없습니다"),
+    ({"title": "t"}, "시작 시각이 없습니다"),
+    ({"title": "t", "start": "내일"}, "시각을 읽을 수 없습니다"),
+    ({"title": "t", "start": "2027-01-05T10:00", "end": "2027-01-05T09:00"}, "종료 시각"),
+    ({"title": "t", "start": "2027-01-05T10:00", "attendee": "누구"}, "알 수 없는 참석자"),
+    ({"title": "t", "start": "2027-01-05T10:00", "rrule": "FREQ=SOMETIMES"}, "반복 규칙"),
+    ({"title": "t", "start": "2027-01-05T10:00", "exdates": "언젠가"}, "시각을 읽을 수 없습니다"),
+    ({"title": "t", "start": "2027-01-05T10:00", "recurrence_id": "20270105T100000"}, "회차별 수정"),
+])
+def test_invalid_rows_are_reported(schedule, row, message):
+    with pytest.raises(ValueError, match=message):
+        normalize(schedule, **row)
@@ -0,0 +1,48 @@
+"""오래된 메모를 연도별 보관 시트로 옮기는 archive_old_memos. 도중에 멈춘 뒤 다시 돌려도 중복되지 않아야 합니다."""
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+
+NOW = datetime(2026, 10, 17, 9, 0, tzinfo=tz.gettz("Asia/Seoul"))
+OLD = [
+    ["2025-01-05T09:00:00+09:00", "작년 메모"],
+    ["2025-03-01T09:00:00+09:00", "작년 메모 2"],
+    ["2026-01-10T09:00:00+09:00", "올해 초 메모"],
+]
+RECENT = [["2026-09-01T09:00:00+09:00", "최근 메모"]]
+
+
+@pytest.fixture
+def backend(schedule, store, fake_backend):
+    backend = fake_backend(memos=OLD + RECENT)
+    schedule.sync_replica(store.replica, store.cache, backend)
+    return backend
+
+
+def test_old_memos_move_to_yearly_archives(schedule, store, backend):
+    assert schedule.archive_old_memos(store.replica, backend, now=NOW) == 3
+
+    assert backend.load_memos(0) == RECENT
+    assert backend.archives == {2025: OLD[:2], 2026: OLD[2:]}
+    assert store.replica.latest_memo() == RECENT[0][1]
+
+
+def test_rerun_after_crash_does_not_archive_twice(schedule, store, backend):
+    # 보관 시트에는 다 썼지만 memo 시트에서 지우기 전에 멈춘 경우
+    backend.fail("delete_memos", ConnectionError("down"))
+    with pytest.raises(ConnectionError):
+        schedule.archive_old_memos(store.replica, backend, now=NOW)
+    assert backend.load_memos(0) == OLD + RECENT
+
+    assert schedule.archive_old_memos(store.replica, backend, now=NOW) == 3
+    assert backend.load_memos(0) == RECENT
+    assert backend.archives == {2025: OLD[:2], 2026: OLD[2:]}
+
+
+def test_nothing_to_archive(schedule, store, fake_backend):
+    backend = fake_backend(memos=RECENT)
+    schedule.sync_replica(store.replica, store.cache, backend)
+
+    assert schedule.archive_old_memos(store.replica, backend, now=NOW) == 0
+    assert backend.archives == {}
@@ -0,0 +1,87 @@
+"""반복 일정 펼치기: EXDATE로 뺀 회차, 회차만 고친 일정(override), 저장 전 작업이 덮인 화면."""
+import pandas as pd
+import pytest
+
+WEEKLY = "FREQ=WEEKLY;COUNT=4"
+WINDOW = (pd.Timestamp("2027-01-01"), pd.Timestamp("2027-02-01"))
+
+
+@pytest.fixture
+def snapshot(schedule, store, fake_backend, make_event):
+    """매주 화요일 10시 반복 일정(1)과, 셋째 회차만 11시로 옮긴 일정(2)이 있는 스냅샷을 만듭니다."""
+
+    def make(*events):
+        backend = fake_backend(events or [
+            make_event(1, "주간회의", "2027-01-05T10:00:00", "2027-01-05T11:00:00",
+                       rrule=WEEKLY, exdates="2027-01-12T10:00:00"),
+            make_event(2, "옮긴 회의", "2027-01-19T11:00:00", "2027-01-19T12:00:00",
+                       recurrence_id="1@2027-01-19T10:00:00"),
+        ])
+        schedule.sync_replica(store.replica, store.cache, backend)
+        store.cache.set(store.replica.read_events())
+        return schedule.RerunSnapshot(store.cache, store.queue)
+
+    return make
+
+
+def starts(df):
+    return sorted((int(i), t.isoformat()) for i, t in zip(df["id"], df["start"]))
+
+
+def test_expand_skips_exdates_and_overridden_occurrences(snapshot):
+    assert starts(snapshot().in_range(*WINDOW)) == [
+        (1, "2027-01-05T10:00:00"),
+        (1, "2027-01-26T10:00:00"),
+        (2, "2027-01-19T11:00:00"),
+    ]
+
+
+def test_expand_covers_occurrences_that_started_before_the_window(schedule, snapshot, make_event):
+    view = snapshot(make_event(1, "밤샘", "2027-01-04T22:00:00", "2027-01-05T02:00:00", rrule="FREQ=DAILY;COUNT=3"))
+    assert starts(view.in_range(pd.Timestamp("2027-01-05"), pd.Timestamp("2027-01-06"))) == [
+        (1, "2027-01-04T22:00:00"),
+        (1, "2027-01-05T22:00:00"),
+    ]
+
+
+def test_pending_override_hides_the_original_occurrence(snapshot, store, make_event):
+    view = snapshot()
+    store.queue.put("insert", 3, make_event(
+        3, "마지막 회차 변경", "2027-01-26T15:00:00", "2027-01-26T16:00:00",
+        recurrence_id="1@2027-01-26T10:00:00",
+    ))
+    assert starts(view.in_range(*WINDOW)) == [
+        (1, "2027-01-05T10:00:00"),
+        (2, "2027-01-19T11:00:00"),
+        (3, "2027-01-26T15:00:00"),
+    ]
+
+
+def test_pending_series_edit_still_skips_stored_overrides(snapshot, store, make_event):
+    view = snapshot()
+    store.queue.put("update", 1, make_event(
+        1, "주간회의 (장소 변경)", "2027-01-05T10:00:00", "2027-01-05T11:00:00",
+        rrule=WEEKLY, exdates="2027-01-12T10:00:00", revision=2,
+    ))
+    df = view.in_range(*WINDOW)
+    assert starts(df) == [
+        (1, "2027-01-05T10:00:00"),
+        (1, "2027-01-26T10:00:00"),
+        (2, "2027-01-19T11:00:00"),
+    ]
+    assert set(df.loc[df["id"] == 1, "title"]) == {"주간회의 (장소 변경)"}
+
+
+def test_moving_a_series_shifts_exdates_and_override_keys(schedule):
+    delta = pd.Timedelta(hours=1)
+    assert schedule.shift_occurrence_keys("2027-01-12T10:00:00,2027-01-05T10:00", delta) == (
+        "2027-01-05T11:00:00,2027-01-12T11:00:00"
+    )
+    assert schedule.shift_occurrence_keys("", delta) == ""
+
+
+def test_conflicts_ignore_the_series_being_edited_and_its_overrides(snapshot):
+    view = snapshot()
+    slots = [(pd.Timestamp("2027-01-19T10:30:00"), pd.Timestamp("2027-01-19T11:30:00"))]
+    assert starts(view.conflicts(slots, {"밍콩콩"})) == [(2, "2027-01-19T11:00:00")]
+    assert view.conflicts(slots, {"밍콩콩"}, exclude_id=1).empty
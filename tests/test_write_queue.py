@@ -0,0 +1,133 @@
+"""쓰기 큐(flush_mutations)의 리비전 충돌, 없는 행, 다시 시도 경로."""
+import pytest
+import requests
+
+SESSION = "session-1"
+
+
+@pytest.fixture
+def synced(schedule, store, fake_backend, make_event):
+    """일정 1개가 있는 저장소. 복제본은 이미 맞춰 둡니다."""
+    backend = fake_backend([make_event(1)])
+    schedule.sync_replica(store.replica, store.cache, backend)
+    return backend
+
+
+def flush(schedule, store, backend):
+    schedule.flush_mutations(store.queue, store.cache, store.replica, backend)
+
+
+def titles(backend):
+    return {record["id"]: record["title"] for record in backend.load_events()}
+
+
+def test_update_is_saved_when_revision_matches(schedule, store, synced, make_event):
+    store.queue.put("update", 1, make_event(1, "고친 약속", revision=2), owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert titles(synced) == {1: "고친 약속"}
+    assert store.replica.read_events()["title"].tolist() == ["고친 약속"]
+    assert store.queue.pop_failures(SESSION) == []
+    assert store.queue.log.entries() == []
+
+
+def test_update_conflicts_when_row_changed_elsewhere(schedule, store, fake_backend, make_event):
+    # 다른 세션이 먼저 고쳐 시트의 리비전이 2가 됐는데, 이 작업은 리비전 1을 보고 만들었습니다.
+    backend = fake_backend([make_event(1, "다른 곳에서 고침", revision=2)])
+    schedule.sync_replica(store.replica, store.cache, backend)
+    store.queue.put("update", 1, make_event(1, "내가 고침", revision=2), owner=SESSION)
+    flush(schedule, store, backend)
+
+    assert titles(backend) == {1: "다른 곳에서 고침"}
+    assert "update_events" not in backend.calls
+    [message] = store.queue.pop_failures(SESSION)
+    assert schedule.WRITE_CONFLICT_MESSAGE in message
+    assert store.queue.log.entries() == []
+
+
+def test_update_of_row_deleted_elsewhere_is_dropped(schedule, store, synced, make_event):
+    synced.events.clear()
+    store.queue.put("update", 1, make_event(1, "고친 약속", revision=2), owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert synced.load_events() == []
+    [message] = store.queue.pop_failures(SESSION)
+    assert "이미 삭제된 일정" in message
+    assert store.queue.pending_op(1) is None
+    assert store.queue.log.entries() == []
+
+
+def test_delete_of_row_deleted_elsewhere_counts_as_done(schedule, store, synced):
+    synced.events.clear()
+    store.queue.put("delete", 1, {"id": 1, "revision": 1}, owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert store.queue.pop_failures(SESSION) == []
+    assert store.queue.log.entries() == []
+
+
+def test_transient_error_keeps_write_for_retry(schedule, store, synced, make_event):
+    synced.fail("update_events", requests.exceptions.ConnectionError("down"))
+    store.queue.put("update", 1, make_event(1, "고친 약속", revision=2), owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert store.queue.retrying
+    assert store.queue.pending_op(1)[0] == "update"
+    assert len(store.queue.log.entries()) == 1
+    assert titles(synced) == {1: "약속"}
+
+    flush(schedule, store, synced)
+    assert not store.queue.retrying
+    assert titles(synced) == {1: "고친 약속"}
+    assert store.queue.pop_failures(SESSION) == []
+    assert store.queue.log.entries() == []
+
+
+def test_other_errors_reject_the_stage(schedule, store, synced, make_event):
+    synced.fail("insert_events", ValueError("bad request"))
+    store.queue.put("insert", 2, make_event(2, "새 약속"), owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert titles(synced) == {1: "약속"}
+    [message] = store.queue.pop_failures(SESSION)
+    assert "'새 약속' 추가를" in message and "bad request" in message
+    assert store.queue.pending_op(2) is None
+    assert store.queue.log.entries() == []
+
+
+def test_insert_that_reached_the_sheet_is_not_sent_twice(schedule, store, synced, make_event):
+    # 시트에는 붙었지만 응답을 받지 못한 경우. 다시 보내기 전에 시트와 맞춰 이미 있는 일정은 끝난 것으로 봅니다.
+    def append_then_time_out(records):
+        synced.events.extend(dict(record) for record in records)
+        synced.version += 1
+        raise requests.exceptions.ConnectionError("timed out")
+
+    synced.insert_events = append_then_time_out
+    store.queue.put("insert", 2, make_event(2, "새 약속"), owner=SESSION)
+    flush(schedule, store, synced)
+    assert store.queue.retrying
+
+    flush(schedule, store, synced)
+    assert [record["id"] for record in synced.load_events()] == [1, 2]
+    assert store.queue.pop_failures(SESSION) == []
+    assert store.queue.log.entries() == []
+
+
+def test_partial_insert_keeps_the_chunks_already_written(schedule, store, synced, make_event):
+    def first_chunk_only(records):
+        synced.events.append(dict(records[0]))
+        synced.version += 1
+        try:
+            raise ValueError("bad chunk")
+        except ValueError as e:
+            raise schedule.PartialInsertError(1) from e
+
+    synced.insert_events = first_chunk_only
+    store.queue.put_many("insert", [make_event(2, "첫 묶음"), make_event(3, "둘째 묶음")], owner=SESSION)
+    flush(schedule, store, synced)
+
+    assert titles(synced) == {1: "약속", 2: "첫 묶음"}
+    assert sorted(store.replica.read_events()["id"].tolist()) == [1, 2]
+    [message] = store.queue.pop_failures(SESSION)
+    assert "'둘째 묶음'" in message and "bad chunk" in message
+    assert store.queue.log.entries() == []